@@ -1,31 +1,327 @@
-import random
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 import matplotlib.pyplot as plt
-import scipy.stats as stats
+from matplotlib.animation import FFMpegWriter
 from scipy.stats import shapiro, probplot
 import time
+import warnings
+
+# p-values past 5000 samples are approximate, which is fine for watching convergence
+warnings.filterwarnings('ignore', message='scipy.stats.shapiro: For N > 5000')
+
+class PValueHistory:
+    """Append-only Shapiro-Wilk p-values for the growing prefixes of a sample.
+
+    Earlier p-values are kept, so a frame only pays for the tests on its own
+    prefixes instead of re-testing every prefix. The sample grows in a buffer
+    that doubles when full. With ``stride`` > 1 the test runs every ``stride``
+    values; ``max_points`` bounds the history by doubling the stride and
+    dropping every other point.
+    """
+
+    def __init__(self, stride=1, max_points=None, capacity=1024):
+        self.stride = stride
+        self.max_points = max_points
+        self._sample = np.empty(capacity)
+        self.size = 0
+        self.trials = []
+        self.p_values = []
+
+    def __len__(self):
+        return len(self.p_values)
+
+    @property
+    def sample(self):
+        return self._sample[:self.size]
+
+    def append(self, value):
+        self.extend([value])
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=float)
+        start = 0
+        while start < len(values):
+            n = self.size
+            # Shapiro-Wilk needs at least 3 observations
+            checkpoint = -(-max(3, n + 1) // self.stride) * self.stride
+            stop = start + checkpoint - n
+            self.insert(values[start:stop])
+            start = stop
+            if self.size == checkpoint:
+                self.record(checkpoint)
+
+    def insert(self, values):
+        needed = self.size + len(values)
+        if needed > len(self._sample):
+            grown = np.empty(max(needed, 2 * len(self._sample)))
+            grown[:self.size] = self.sample
+            self._sample = grown
+        self._sample[self.size:needed] = values
+        self.size = needed
+
+    def record(self, n):
+        self.trials.append(n)
+        # shapiro sorts its own copy of the sample
+        self.p_values.append(shapiro(self.sample)[1])
+        if self.max_points is not None and len(self.p_values) > self.max_points:
+            self.decimate()
+
+    def decimate(self):
+        self.stride *= 2
+        kept = [(t, p) for t, p in zip(self.trials, self.p_values) if t % self.stride == 0]
+        self.trials = [t for t, _ in kept]
+        self.p_values = [p for _, p in kept]
+
+
+class MomentAccumulator:
+    """Streaming count, mean and central moments up to the fourth order.
+
+    Batches are folded in with the pairwise update formulas of Chan et al. and
+    Pebay, so accumulators built on separate chunks or workers can be merged
+    and still give the same skewness and kurtosis as ``scipy.stats``.
+    """
 
-class DiceExperiment:
     def __init__(self):
-        self.fig, self.ax = plt.subplots(2, 3, figsize=(15, 10))
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+
+    @classmethod
+    def from_values(cls, values):
+        values = np.asarray(values, dtype=float)
+        accumulator = cls()
+        if len(values):
+            deviations = values - values.mean()
+            squared = deviations ** 2
+            accumulator.count = len(values)
+            accumulator.mean = values.mean()
+            accumulator.m2 = squared.sum()
+            accumulator.m3 = (squared * deviations).sum()
+            accumulator.m4 = (squared ** 2).sum()
+        return accumulator
+
+    def update(self, values):
+        self.merge(MomentAccumulator.from_values(values))
+        return self
+
+    def merge(self, other):
+        n_a, n_b = self.count, other.count
+        if n_b == 0:
+            return self
+        if n_a == 0:
+            self.count, self.mean, self.m2, self.m3, self.m4 = (
+                other.count, other.mean, other.m2, other.m3, other.m4)
+            return self
+        n = n_a + n_b
+        delta = other.mean - self.mean
+        m2 = self.m2 + other.m2 + delta ** 2 * n_a * n_b / n
+        m3 = (self.m3 + other.m3
+              + delta ** 3 * n_a * n_b * (n_a - n_b) / n ** 2
+              + 3 * delta * (n_a * other.m2 - n_b * self.m2) / n)
+        m4 = (self.m4 + other.m4
+              + delta ** 4 * n_a * n_b * (n_a ** 2 - n_a * n_b + n_b ** 2) / n ** 3
+              + 6 * delta ** 2 * (n_a ** 2 * other.m2 + n_b ** 2 * self.m2) / n ** 2
+              + 4 * delta * (n_a * other.m3 - n_b * self.m3) / n)
+        self.count = n
+        self.mean += delta * n_b / n
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else np.nan
+
+    @property
+    def skewness(self):
+        # Biased estimator, matches scipy.stats.skew(values)
+        if self.count == 0 or self.m2 == 0:
+            return np.nan
+        return np.sqrt(self.count) * self.m3 / self.m2 ** 1.5
+
+    @property
+    def kurtosis(self):
+        # Fisher excess kurtosis, matches scipy.stats.kurtosis(values)
+        if self.count == 0 or self.m2 == 0:
+            return np.nan
+        return self.count * self.m4 / self.m2 ** 2 - 3.0
+
+
+class HistogramAccumulator:
+    """Fixed-bin histogram counts updated one batch at a time.
+
+    Bins are ``bins`` equal-width intervals over ``[low, high]`` with the last
+    bin closed, as in ``np.histogram``; values outside the range are dropped.
+    """
+
+    def __init__(self, low, high, bins):
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.edges = np.linspace(low, high, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[(values >= self.low) & (values <= self.high)]
+        # Dice means fall exactly on bin edges, so bin against the edges themselves rather
+        # than scaling, which rounds some of those values into the neighbouring bin
+        positions = np.searchsorted(self.edges, values, side='right') - 1
+        np.minimum(positions, self.bins - 1, out=positions)
+        self.counts += np.bincount(positions, minlength=self.bins)
+        return self
+
+    def merge(self, other):
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Cannot merge histograms with different bin edges")
+        self.counts += other.counts
+        return self
+
+
+class DiceSimulation:
+    """NumPy engine that rolls ``trials_per_frame`` trials of ``n_dice`` dice per step.
+
+    Each step draws one ``(trials_per_frame, n_dice)`` integer array from a
+    seedable ``Generator`` and appends the row means to a preallocated buffer
+    that doubles in size when full.
+    """
+
+    def __init__(self, n_dice=7, faces=6, trials_per_frame=1, seed=None, capacity=1024):
+        self.n_dice = n_dice
+        self.faces = faces
+        self.trials_per_frame = trials_per_frame
+        self.rng = np.random.default_rng(seed)
+        self._means = np.empty(capacity)
         self.trial_count = 0
-        self.mean_values = []
 
-        while True:
-            self.update_plots()
-            plt.pause(0.5)  # Pause for 0.5 seconds
+    @property
+    def means(self):
+        return self._means[:self.trial_count]
+
+    def roll(self, trials=None):
+        if trials is None:
+            trials = self.trials_per_frame
+        return self.rng.integers(1, self.faces + 1, size=(trials, self.n_dice))
 
-    def roll_dice(self):
-        return [random.randint(1, 6) for _ in range(7)]
+    def step(self, trials=None):
+        new_means = self.roll(trials).mean(axis=1)
+        self._append(new_means)
+        return new_means
+
+    def run(self, total_trials, batch_size=1_000_000):
+        while self.trial_count < total_trials:
+            self.step(min(batch_size, total_trials - self.trial_count))
+        return self.means
+
+    def _append(self, values):
+        needed = self.trial_count + len(values)
+        if needed > len(self._means):
+            grown = np.empty(max(needed, 2 * len(self._means)))
+            grown[:self.trial_count] = self.means
+            self._means = grown
+        self._means[self.trial_count:needed] = values
+        self.trial_count = needed
+
+
+class DiceExperiment:
+    def __init__(self, n_dice=7, faces=6, trials_per_frame=1, seed=None,
+                 p_value_stride=None, max_p_values=None, bins=20, max_qq_points=2000,
+                 animated=False):
+        self.fig, self.ax = plt.subplots(2, 3, figsize=(15, 10))
+        self.simulation = DiceSimulation(n_dice, faces, trials_per_frame, seed)
+        # One Shapiro-Wilk test per step by default: testing every prefix of a large batch costs minutes
+        self.p_history = PValueHistory(stride=p_value_stride or trials_per_frame, max_points=max_p_values)
+        self.bins = bins
+        self.moments = MomentAccumulator()
+        self.histogram = HistogramAccumulator(*self.value_range, bins)
+        self.max_qq_points = max_qq_points
+        self.animated = animated
+        self.limits_changed = False
+        self.artists = []
+        self.setup_plots()
 
-    def calculate_mean(self, dice_rolls):
-        return np.mean(dice_rolls)
+    @property
+    def trial_count(self):
+        return self.simulation.trial_count
+
+    @property
+    def mean_values(self):
+        return self.simulation.means
+
+    @property
+    def value_range(self):
+        return (0.5, self.simulation.faces + 0.5)
+
+    def track(self, artist):
+        """Register an artist that is updated in place on every frame."""
+        artist.set_animated(self.animated)
+        self.artists.append(artist)
+        return artist
+
+    def grow_limit(self, ax, axis, value, factor=2.0):
+        """Widen an axis geometrically so limits (and full redraws) change rarely."""
+        get_lim, set_lim = (ax.get_xlim, ax.set_xlim) if axis == 'x' else (ax.get_ylim, ax.set_ylim)
+        low, high = get_lim()
+        if value > high:
+            set_lim(low, value * factor)
+            self.limits_changed = True
+
+    def setup_plots(self):
+        self.bin_edges = self.histogram.edges
+        self.histogram_bars = self.setup_histogram(self.ax[0][0], 'Histogram of Means')
+        self.histogram_label = self.track(
+            self.ax[0][0].annotate('', xy=(0.7, 0.9), xycoords='axes fraction'))
+
+        ax = self.ax[0][1]
+        self.qq_points, = ax.plot([], [], 'bo')
+        self.qq_fit, = ax.plot([], [], 'r-')
+        self.track(self.qq_points)
+        self.track(self.qq_fit)
+        ax.set_xlim(-2, 2)
+        ax.set_ylim(*self.value_range)
+        ax.set_title('QQ Plot')
+        ax.set_xlabel('Theoretical quantiles')
+        ax.set_ylabel('Ordered Values')
+        self.qq_label = self.track(ax.annotate('', xy=(0.7, 0.9), xycoords='axes fraction'))
+
+        ax = self.ax[0][2]
+        ax.axis('off')
+        self.shapiro_texts = [self.track(ax.text(0.1, y, '', fontsize=12)) for y in (0.8, 0.7, 0.5, 0.3)]
+
+        ax = self.ax[1][0]
+        self.p_value_line, = ax.plot([], [])
+        self.track(self.p_value_line)
+        ax.set_xlim(0, 10)
+        ax.set_ylim(0, 1)
+        ax.set_title('P-values from Shapiro-Wilk Test')
+        ax.set_xlabel('Trial Number')
+        ax.set_ylabel('p-value')
+
+        self.original_bars = self.setup_histogram(self.ax[1][1], 'Original Distribution of Means')
+
+    def setup_histogram(self, ax, title):
+        widths = np.diff(self.bin_edges)
+        bars = ax.bar(self.bin_edges[:-1], np.zeros(self.bins), width=widths, align='edge', alpha=0.75)
+        for bar in bars:
+            self.track(bar)
+        ax.set_xlim(*self.value_range)
+        ax.set_ylim(0, 1)
+        ax.set_title(title)
+        ax.set_xlabel('Mean Value')
+        ax.set_ylabel('Frequency')
+        ax.set_xticks(range(1, self.simulation.faces + 1))
+        return bars
 
     def update_plots(self):
-        dice_rolls = self.roll_dice()
-        mean_value = self.calculate_mean(dice_rolls)
-        self.mean_values.append(mean_value)
-        self.trial_count += 1
+        new_means = self.simulation.step()
+        self.p_history.extend(new_means)
+        self.moments.update(new_means)
+        self.histogram.update(new_means)
+        self.limits_changed = False
 
         self.plot_histogram()
         self.plot_qq_plot()
@@ -33,65 +329,299 @@ class DiceExperiment:
         self.plot_p_values()
         self.plot_original_distribution()
 
+    def set_bar_heights(self, ax, bars, counts):
+        for bar, count in zip(bars, counts):
+            bar.set_height(count)
+        self.grow_limit(ax, 'y', counts.max(), factor=1.5)
+
     def plot_histogram(self):
-        ax = self.ax[0][0]
-        ax.clear()
-        ax.hist(self.mean_values, bins=20, range=(0.5, 6.5), alpha=0.75)
-        ax.set_title('Histogram of Means')
-        ax.set_xlabel('Mean Value')
-        ax.set_ylabel('Frequency')
-        ax.set_xticks(range(1, 7))
-        ax.annotate(f'Trials: {self.trial_count}', xy=(0.7, 0.9), xycoords='axes fraction')
+        self.set_bar_heights(self.ax[0][0], self.histogram_bars, self.histogram.counts)
+        self.histogram_label.set_text(f'Trials: {self.trial_count}')
 
     def plot_qq_plot(self):
         ax = self.ax[0][1]
-        ax.clear()
-        probplot(self.mean_values, dist="norm", plot=ax)
-        ax.set_title('QQ Plot')
-        ax.annotate(f'Trials: {self.trial_count}', xy=(0.7, 0.9), xycoords='axes fraction')
+        (osm, osr), (slope, intercept, _) = probplot(self.mean_values, dist="norm")
+        if len(osm) > self.max_qq_points:
+            keep = np.linspace(0, len(osm) - 1, self.max_qq_points).astype(int)
+            osm, osr = osm[keep], osr[keep]
+        self.qq_points.set_data(osm, osr)
+        ends = np.array([osm[0], osm[-1]])
+        self.qq_fit.set_data(ends, slope * ends + intercept)
+        low, high = ax.get_xlim()
+        if osm[0] < low or osm[-1] > high:
+            edge = max(-osm[0], osm[-1]) * 1.25
+            ax.set_xlim(-edge, edge)
+            self.limits_changed = True
+        self.qq_label.set_text(f'Trials: {self.trial_count}')
 
     def plot_shapiro_test_result(self):
-        ax = self.ax[0][2]
-        ax.clear()
-        ax.axis('off')
-
-        if len(self.mean_values) >= 3:
-            try:
-                shapiro_stat, p_value = shapiro(self.mean_values)
-                skewness = stats.skew(self.mean_values)
-                kurtosis = stats.kurtosis(self.mean_values)
-
-                ax.text(0.1, 0.8, f'Shapiro-Wilk Test:', fontsize=12)
-                ax.text(0.1, 0.7, f'p-value: {p_value:.3f}', fontsize=12)
-                ax.text(0.1, 0.5, f'Skewness: {skewness:.3f}', fontsize=12)
-                ax.text(0.1, 0.3, f'Kurtosis: {kurtosis:.3f}', fontsize=12)
-            except Exception as e:
-                ax.text(0.1, 0.5, f'Shapiro-Wilk Test Error', fontsize=12)
+        if len(self.p_history) > 0:
+            # p-value of the latest checkpoint; the moments cover every trial
+            p_value = self.p_history.p_values[-1]
+            lines = ['Shapiro-Wilk Test:', f'p-value: {p_value:.3f}',
+                     f'Skewness: {self.moments.skewness:.3f}', f'Kurtosis: {self.moments.kurtosis:.3f}']
         else:
-            ax.text(0.1, 0.5, 'Insufficient data for Shapiro-Wilk test', fontsize=12)
+            lines = ['', '', 'Insufficient data for Shapiro-Wilk test', '']
+        for text, line in zip(self.shapiro_texts, lines):
+            text.set_text(line)
 
     def plot_p_values(self):
-        ax = self.ax[1][0]
-        ax.clear()
-        if len(self.mean_values) > 0:
-            try:
-                p_values = [shapiro(self.mean_values[:i])[1] for i in range(1, self.trial_count + 1)]
-                ax.plot([i for i in range(1, self.trial_count + 1)], p_values)
-                ax.set_title('P-values from Shapiro-Wilk Test')
-                ax.set_xlabel('Trial Number')
-                ax.set_ylabel('p-value')
-            except Exception as e:
-                ax.text(0.1, 0.5, f'Error: {str(e)}', fontsize=12)
+        if len(self.p_history) > 0:
+            self.p_value_line.set_data(self.p_history.trials, self.p_history.p_values)
+            self.grow_limit(self.ax[1][0], 'x', self.p_history.trials[-1])
 
     def plot_original_distribution(self):
-        ax = self.ax[1][1]
-        ax.clear()
-        ax.hist(self.mean_values[:self.trial_count], bins=20, range=(0.5, 6.5), alpha=0.75)
-        ax.set_title('Original Distribution of Means')
-        ax.set_xlabel('Mean Value')
-        ax.set_ylabel('Frequency')
-        ax.set_xticks(range(1, 7))
+        self.set_bar_heights(self.ax[1][1], self.original_bars, self.histogram.counts)
+
+
+class InteractiveRenderer:
+    """Shows the experiment in a GUI window, blitting only the tracked artists.
+
+    The static parts of the figure (axes, labels, ticks) are cached as a
+    background and only redrawn when an axis limit has to change.
+    """
+
+    def __init__(self, experiment, interval=0.5):
+        self.experiment = experiment
+        self.interval = interval
+        self.background = None
+        canvas = experiment.fig.canvas
+        canvas.mpl_connect('draw_event', self.on_draw)
+
+    def on_draw(self, event):
+        canvas = self.experiment.fig.canvas
+        self.background = canvas.copy_from_bbox(self.experiment.fig.bbox)
+        self.draw_artists()
+
+    def draw_artists(self):
+        fig = self.experiment.fig
+        for artist in self.experiment.artists:
+            fig.draw_artist(artist)
+
+    def run(self, frames=None):
+        fig = self.experiment.fig
+        canvas = fig.canvas
+        plt.show(block=False)
+        canvas.draw()
+        frame = 0
+        while (frames is None or frame < frames) and plt.fignum_exists(fig.number):
+            self.experiment.update_plots()
+            if self.experiment.limits_changed or self.background is None:
+                canvas.draw()
+            else:
+                canvas.restore_region(self.background)
+                self.draw_artists()
+            canvas.blit(fig.bbox)
+            canvas.flush_events()
+            canvas.start_event_loop(self.interval)
+            frame += 1
+
+
+class HeadlessRenderer:
+    """Runs the experiment on the Agg backend as fast as the math allows.
+
+    Every ``save_every`` frames the figure is written to ``output_dir`` as a PNG
+    and/or appended to an MP4 at ``video_path`` (needs ffmpeg on the PATH).
+    """
+
+    def __init__(self, experiment, output_dir=None, save_every=1, video_path=None, fps=10):
+        self.experiment = experiment
+        self.output_dir = output_dir
+        self.save_every = save_every
+        self.video_path = video_path
+        self.fps = fps
+
+    def run(self, frames):
+        fig = self.experiment.fig
+        if self.output_dir is not None:
+            os.makedirs(self.output_dir, exist_ok=True)
+        writer = None
+        if self.video_path is not None:
+            writer = FFMpegWriter(fps=self.fps)
+            writer.setup(fig, self.video_path)
+        try:
+            for frame in range(1, frames + 1):
+                self.experiment.update_plots()
+                if frame % self.save_every and frame != frames:
+                    continue
+                if self.output_dir is not None:
+                    fig.savefig(os.path.join(self.output_dir, f'frame_{frame:06d}.png'))
+                if writer is not None:
+                    writer.grab_frame()
+        finally:
+            if writer is not None:
+                writer.finish()
+
+
+def expected_kurtosis(n_dice, faces):
+    """Excess kurtosis of the mean of ``n_dice`` fair dice; 0 in the normal limit."""
+    single_die = -6 * (faces ** 2 + 1) / (5 * (faces ** 2 - 1))
+    return single_die / n_dice
+
+
+def summarize_trials(n_dice, faces, trials, seed, bins=20, batch_size=1_000_000):
+    """Roll ``trials`` trials and return their moment and histogram accumulators.
+
+    Means are folded into the accumulators batch by batch and never kept, so
+    memory stays at O(batch_size + bins) however many trials are run.
+    """
+    simulation = DiceSimulation(n_dice, faces, seed=seed, capacity=0)
+    moments = MomentAccumulator()
+    histogram = HistogramAccumulator(0.5, faces + 0.5, bins)
+    remaining = trials
+    while remaining > 0:
+        means = simulation.roll(min(batch_size, remaining)).mean(axis=1)
+        moments.update(means)
+        histogram.update(means)
+        remaining -= len(means)
+    return moments, histogram
+
+
+def sweep_tasks(grid, chunk_trials):
+    """Split every configuration into chunks of at most ``chunk_trials`` trials.
+
+    Each chunk gets its own child of the configuration's ``SeedSequence`` so the
+    merged result does not depend on how many workers ran it.
+    """
+    tasks = []
+    for index, (n_dice, faces, trials, seed) in enumerate(grid):
+        chunks = -(-trials // chunk_trials)
+        seeds = np.random.SeedSequence(seed).spawn(chunks)
+        for chunk, chunk_seed in enumerate(seeds):
+            chunk_size = min(chunk_trials, trials - chunk * chunk_trials)
+            tasks.append((index, n_dice, faces, chunk_size, chunk_seed))
+    return tasks
+
+
+def run_sweep_task(task, bins=20):
+    index, n_dice, faces, trials, seed = task
+    return index, summarize_trials(n_dice, faces, trials, seed, bins=bins)
+
+
+def run_sweep(grid, workers=None, chunk_trials=1_000_000, bins=20):
+    """Run a grid of ``(n_dice, faces, trials, seed)`` configurations on a process pool.
+
+    Returns one merged ``(moments, histogram)`` pair per configuration, in grid order.
+    """
+    summaries = [(MomentAccumulator(), HistogramAccumulator(0.5, faces + 0.5, bins))
+                 for _, faces, _, _ in grid]
+    tasks = sweep_tasks(grid, chunk_trials)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_sweep_task, task, bins) for task in tasks]
+        for future in as_completed(futures):
+            index, (moments, histogram) = future.result()
+            summaries[index][0].merge(moments)
+            summaries[index][1].merge(histogram)
+    return summaries
+
+
+def write_sweep_results(path, grid, summaries):
+    """Write one row per configuration to ``.npz`` or, if pandas/pyarrow are available, ``.parquet``."""
+    columns = {
+        'dice': np.array([config[0] for config in grid]),
+        'faces': np.array([config[1] for config in grid]),
+        'trials': np.array([config[2] for config in grid]),
+        'seed': np.array([config[3] for config in grid]),
+        'mean': np.array([moments.mean for moments, _ in summaries]),
+        'variance': np.array([moments.variance for moments, _ in summaries]),
+        'skewness': np.array([moments.skewness for moments, _ in summaries]),
+        'kurtosis': np.array([moments.kurtosis for moments, _ in summaries]),
+        'expected_kurtosis': np.array([expected_kurtosis(config[0], config[1]) for config in grid]),
+    }
+    histograms = np.array([histogram.counts for _, histogram in summaries])
+    if path.endswith('.parquet'):
+        import pandas as pd
+        table = pd.DataFrame(columns)
+        table['histogram'] = list(histograms)
+        table.to_parquet(path, index=False)
+    else:
+        np.savez_compressed(path, histograms=histograms, **columns)
+    return columns
+
+
+def plot_sweep_summary(columns, path):
+    fig, (kurtosis_ax, skewness_ax) = plt.subplots(1, 2, figsize=(14, 6))
+    for faces in np.unique(columns['faces']):
+        rows = columns['faces'] == faces
+        dice = columns['dice'][rows]
+        order = np.argsort(dice)
+        kurtosis_ax.scatter(dice, columns['kurtosis'][rows], label=f'{faces} faces (observed)')
+        kurtosis_ax.plot(dice[order], columns['expected_kurtosis'][rows][order], '--',
+                         label=f'{faces} faces (expected)')
+    kurtosis_ax.axhline(0, color='gray', linewidth=0.8)
+    kurtosis_ax.set_title('Excess Kurtosis of the Mean')
+    kurtosis_ax.set_xlabel('Dice per Trial')
+    kurtosis_ax.set_ylabel('Excess Kurtosis')
+    kurtosis_ax.legend(fontsize='small')
+
+    for n_dice in np.unique(columns['dice']):
+        rows = columns['dice'] == n_dice
+        skewness_ax.scatter(columns['trials'][rows], np.abs(columns['skewness'][rows]), label=f'{n_dice} dice')
+    skewness_ax.set_xscale('log')
+    skewness_ax.set_yscale('log')
+    skewness_ax.set_title('|Skewness| of the Mean')
+    skewness_ax.set_xlabel('Trials')
+    skewness_ax.set_ylabel('|Skewness|')
+    skewness_ax.legend(fontsize='small')
+
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Central limit theorem demo with rolling dice.')
+    parser.add_argument('--dice', type=int, default=7, help='dice rolled per trial')
+    parser.add_argument('--faces', type=int, default=6, help='faces per die')
+    parser.add_argument('--trials-per-frame', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--p-value-stride', type=int, default=None,
+                        help='trials between Shapiro-Wilk tests (default: --trials-per-frame)')
+    parser.add_argument('--max-p-values', type=int, default=None)
+    parser.add_argument('--interval', type=float, default=0.5, help='seconds between interactive frames')
+    parser.add_argument('--headless', action='store_true', help='render offscreen with Agg')
+    parser.add_argument('--frames', type=int, default=None, help='frames to run (required with --headless)')
+    parser.add_argument('--output-dir', default=None, help='directory for PNG frames')
+    parser.add_argument('--save-every', type=int, default=1, help='save every Nth frame')
+    parser.add_argument('--video', default=None, help='MP4 file to write frames to')
+    sweep = parser.add_argument_group('sweep mode')
+    sweep.add_argument('--sweep', action='store_true', help='run a grid of configurations on all cores')
+    sweep.add_argument('--sweep-dice', type=int, nargs='+', default=[1, 2, 3, 5, 7, 10, 20])
+    sweep.add_argument('--sweep-faces', type=int, nargs='+', default=[6])
+    sweep.add_argument('--sweep-trials', type=int, nargs='+', default=[1_000, 100_000, 10_000_000])
+    sweep.add_argument('--sweep-seeds', type=int, nargs='+', default=[0])
+    sweep.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    sweep.add_argument('--chunk-trials', type=int, default=1_000_000, help='trials per worker task')
+    sweep.add_argument('--results', default='clt_sweep.npz', help='.npz or .parquet results table')
+    sweep.add_argument('--summary-plot', default='clt_sweep.png', help='PNG with the summary plots')
+    args = parser.parse_args()
+    if args.headless and args.frames is None:
+        parser.error('--headless needs --frames')
+    return args
+
+
+def main_sweep(args):
+    plt.switch_backend('Agg')
+    grid = list(itertools.product(args.sweep_dice, args.sweep_faces, args.sweep_trials, args.sweep_seeds))
+    start = time.perf_counter()
+    summaries = run_sweep(grid, args.workers, args.chunk_trials)
+    columns = write_sweep_results(args.results, grid, summaries)
+    plot_sweep_summary(columns, args.summary_plot)
+    print(f'{len(grid)} configurations in {time.perf_counter() - start:.1f}s -> {args.results}, {args.summary_plot}')
 
 
 if __name__ == "__main__":
-    experiment = DiceExperiment()
+    args = parse_args()
+    if args.sweep:
+        main_sweep(args)
+        raise SystemExit
+    if args.headless:
+        plt.switch_backend('Agg')
+    experiment = DiceExperiment(
+        n_dice=args.dice, faces=args.faces, trials_per_frame=args.trials_per_frame, seed=args.seed,
+        p_value_stride=args.p_value_stride, max_p_values=args.max_p_values, animated=not args.headless
+    )
+    if args.headless:
+        HeadlessRenderer(experiment, args.output_dir, args.save_every, args.video).run(args.frames)
+    else:
+        InteractiveRenderer(experiment, args.interval).run(args.frames)
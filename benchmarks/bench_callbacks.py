@@ -0,0 +1,225 @@
+"""Wall time, peak memory and payload size of the dashboard callbacks and the CLT update step.
+
+For each size, synthetic mouse-study and world-data CSVs with that many rows
+are written to a temporary directory and a fresh interpreter loads both apps
+from them (so module-level loading and the figure caches start cold). It then
+calls ``update_weight_histogram``, ``update_survival_function_time`` and the
+world ``update_graphs`` directly, with the figure caches cleared before every
+call, plus ``DiceExperiment.update_plots`` from the CLT script.
+
+Wall time is the best of ``--repeat`` calls; peak memory is the tracemalloc
+peak of one extra call; payload is the size of the JSON Dash would send.
+``--output`` appends the results, tagged with the current commit, as JSON
+lines, so runs can be compared across commits.
+
+The world data is capped at ``--max-world-rows`` (10K by default): every
+world panel draws all its rows, so ``update_graphs`` takes about 18 s per
+call at 100K. Larger sizes, such as 10M rows, have to be asked for explicitly.
+
+    python benchmarks/bench_callbacks.py [--sizes 1000 100000 1000000] [--max-world-rows 10000]
+                                         [--output results.jsonl]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_world_cleaning import synthetic_world_data  # noqa: E402
+from wsgi import load_script  # noqa: E402
+
+DRUGS = ['Capomulin', 'Ceftamin', 'Infubinol', 'Ketapril', 'Naftisol',
+         'Placebo', 'Propriva', 'Ramicane', 'Stelasyn', 'Zoniferol']
+TIMEPOINTS = np.arange(0, 50, 5)
+CHUNK_ROWS = 1_000_000
+
+
+def write_mouse_study(directory, rows, seed=0):
+    """About ``rows`` study results: one row per mouse and timepoint until the mouse dies."""
+    rng = np.random.default_rng(seed)
+    mice = max(rows // 6, len(DRUGS))
+    ids = np.char.add('m', np.arange(mice).astype(str))
+    metadata = pd.DataFrame({
+        'Mouse ID': ids,
+        'Drug Regimen': rng.choice(DRUGS, mice),
+        'Sex': rng.choice(['Male', 'Female'], mice),
+        'Age_months': rng.integers(1, 25, mice),
+        'Weight (g)': rng.integers(15, 31, mice),
+    })
+    metadata_path = os.path.join(directory, 'Mouse_metadata.csv')
+    metadata.to_csv(metadata_path, index=False)
+
+    lifetimes = rng.integers(1, len(TIMEPOINTS) + 1, mice)
+    results_path = os.path.join(directory, 'Study_results.csv')
+    for start in range(0, mice, CHUNK_ROWS):
+        chunk = slice(start, start + CHUNK_ROWS)
+        mouse = np.repeat(np.arange(mice)[chunk], lifetimes[chunk])
+        timepoint = TIMEPOINTS[np.concatenate([np.arange(n) for n in lifetimes[chunk]])]
+        pd.DataFrame({
+            'Mouse ID': ids[mouse],
+            'Timepoint': timepoint,
+            'Tumor Volume (mm3)': rng.normal(45, 5, len(mouse)),
+            'Metastatic Sites': rng.integers(0, 5, len(mouse)),
+        }).to_csv(results_path, index=False, mode='a' if start else 'w', header=not start)
+    return metadata_path, results_path
+
+
+def write_world_data(directory, rows, seed=0):
+    """``rows`` world-data rows, cycling through real country names so the map can locate them."""
+    import plotly.express as px
+    countries = px.data.gapminder()['country'].unique()
+    path = os.path.join(directory, 'world-data-2023.csv')
+    for start in range(0, rows, CHUNK_ROWS):
+        size = min(CHUNK_ROWS, rows - start)
+        chunk = synthetic_world_data(size, seed=seed + start)
+        chunk['Country'] = countries[(start + np.arange(size)) % len(countries)]
+        chunk.to_csv(path, index=False, mode='a' if start else 'w', header=not start)
+    return path
+
+
+def payload_bytes(result):
+    from plotly.io.json import to_json_plotly
+    if result is None:
+        return None
+    figures = result if isinstance(result, tuple) else (result,)
+    return sum(len(to_json_plotly(figure)) for figure in figures)
+
+
+def measure(name, func, args, repeat, reset=None):
+    """Best wall time of ``repeat`` calls, tracemalloc peak of one more, and the payload size."""
+    seconds = []
+    for _ in range(repeat):
+        if reset is not None:
+            reset()
+        start = time.perf_counter()
+        result = func(*args)
+        seconds.append(time.perf_counter() - start)
+    if reset is not None:
+        reset()
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'benchmark': name, 'seconds': min(seconds), 'peak_bytes': peak, 'payload_bytes': payload_bytes(result)}
+
+
+def clear_cache(cache):
+    return lambda: cache.set_version(cache.version)
+
+
+def run_size(rows, world_rows, repeat):
+    """Runs in the child interpreter: load the apps from this size's CSVs and time the callbacks."""
+    results = []
+    start = time.perf_counter()
+    import dash_app_mous
+    results.append({'benchmark': 'load mouse app', 'seconds': time.perf_counter() - start})
+    start = time.perf_counter()
+    world = load_script('world_data_2023.app.py', 'world_data_2023_app')
+    results.append({'benchmark': 'load world app', 'seconds': time.perf_counter() - start})
+
+    mouse_cache = clear_cache(dash_app_mous.figure_cache)
+    all_groups = sorted(dash_app_mous.drug_groups)
+    results.append(measure('update_weight_histogram', dash_app_mous.update_weight_histogram,
+                           [DRUGS], repeat, mouse_cache))
+    results.append(measure('update_survival_function_time', dash_app_mous.update_survival_function_time,
+                           [all_groups, 'count'], repeat, mouse_cache))
+    results.append(measure('update_survival_function_time (kaplan-meier)',
+                           dash_app_mous.update_survival_function_time,
+                           [all_groups, 'kaplan-meier'], repeat, mouse_cache))
+    world_cache = clear_cache(world.figure_cache)
+    world_results = [measure('update_graphs (all countries)', world.update_graphs, [[]], repeat, world_cache)]
+    some_countries = sorted(world.data['Country'].unique())[:20]
+    world_results.append(measure('update_graphs (20 countries)', world.update_graphs, [some_countries], repeat,
+                                 world_cache))
+    for result in world_results:
+        result['world_rows'] = world_rows
+    results.extend(world_results)
+
+    import matplotlib
+    matplotlib.use('Agg')
+    clt = load_script('Central limit theorem whit matplotlib.py', 'clt')
+    # Ten frames reach ``rows`` trials; the last one is measured
+    frames = 10
+    experiment = clt.DiceExperiment(trials_per_frame=max(rows // frames, 1), seed=0,
+                                    p_value_stride=max(rows // 100, 1), max_p_values=1000)
+    for _ in range(frames - 1):
+        experiment.update_plots()
+    results.append(measure('DiceExperiment.update_plots', experiment.update_plots, [], 1))
+
+    for result in results:
+        result['rows'] = rows
+    results.append({'benchmark': 'process max RSS', 'rows': rows,
+                    'peak_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024})
+    return results
+
+
+def run_in_child(rows, world_rows, repeat, directory):
+    metadata_path, results_path = write_mouse_study(directory, rows)
+    world_path = write_world_data(directory, world_rows)
+    env = dict(os.environ, MOUSE_METADATA_CSV=metadata_path, STUDY_RESULTS_CSV=results_path,
+               WORLD_DATA_CSV=world_path, DATA_SNAPSHOT_DIR=os.path.join(directory, 'snapshots'),
+               WORLD_PREBUILD='0')
+    for variable in ('MOUSE_FIGURE_CACHE_DIR', 'WORLD_FIGURE_CACHE_DIR', 'MOUSE_FIGURE_CACHE_TTL'):
+        env.pop(variable, None)
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', str(rows),
+                             '--max-world-rows', str(world_rows), '--repeat', str(repeat)],
+                            env=env, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return [json.loads(line) for line in output.splitlines() if line.startswith('{')]
+
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_value(value, scale, unit):
+    return f'{value / scale:10.2f} {unit}' if value is not None else f'{"":>10s}   '
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--max-world-rows', type=int, default=10_000,
+                        help='rows of world data at most, whatever the size (default: 10000)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='Append results as JSON lines to this file')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    if args.child is not None:
+        for result in run_size(args.child, args.max_world_rows, args.repeat):
+            print(json.dumps(result))
+        raise SystemExit
+
+    commit = current_commit()
+    print(f'{"rows":>10s}  {"benchmark":46s} {"wall":>13s} {"peak memory":>13s} {"payload":>13s}')
+    for rows in args.sizes:
+        world_rows = min(rows, args.max_world_rows)
+        with tempfile.TemporaryDirectory() as directory:
+            results = run_in_child(rows, world_rows, args.repeat, directory)
+        for result in results:
+            print(f'{result.get("world_rows", rows):>10,}  {result["benchmark"]:46s}'
+                  f' {format_value(result.get("seconds"), 1e-3, "ms")}'
+                  f' {format_value(result.get("peak_bytes"), 2 ** 20, "MB")}'
+                  f' {format_value(result.get("payload_bytes"), 2 ** 10, "KB")}')
+        if args.output:
+            with open(args.output, 'a') as file:
+                for result in results:
+                    file.write(json.dumps({'commit': commit, **result}) + '\n')
@@ -0,0 +1,117 @@
+"""Compare the chunked campaign pipeline with the notebook's in-memory pandas analysis.
+
+Writes a synthetic bank-marketing CSV (2M rows by default) with the
+columns of dataset.KEGGEL.csv, runs the notebook's steps on the fully loaded
+frame, then campaign_pipeline.summarize in one process and in ``--processes``
+workers, checking that every aggregate agrees.
+
+    python benchmarks/bench_campaign_pipeline.py [--rows 2000000] [--processes 4]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+from scipy.stats import ttest_ind
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_world_cleaning import timed  # noqa: E402
+from campaign_pipeline import DURATION_BINS, DURATION_LABELS, FREQUENCY_BINS, FREQUENCY_LABELS, summarize  # noqa: E402
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October',
+          'November', 'December']
+CHUNK_ROWS = 1_000_000
+
+
+def write_campaign_data(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, CHUNK_ROWS):
+        size = min(CHUNK_ROWS, rows - start)
+        converted = rng.random(size) < 0.12
+        pd.DataFrame({
+            'occupation': rng.choice(['manual_worker', 'management', 'technician', 'retired'], size),
+            'age': rng.integers(18, 95, size),
+            'education_level': rng.choice(['high_school', 'university', 'primary', 'unknown'], size),
+            'marital_status': rng.choice(['married', 'single', 'divorced'], size),
+            'communication_channel': rng.choice(['mobile', 'landline', 'unidentified'], size),
+            'call_month': rng.choice(MONTHS, size),
+            'call_day': rng.integers(1, 32, size),
+            'call_duration': rng.exponential(np.where(converted, 500, 220)).astype(np.int64),
+            'call_frequency': rng.geometric(0.4, size),
+            'previous_campaign_outcome': rng.choice(['successful', 'unidentified', 'unsuccessful', 'other_outcome'],
+                                                    size, p=[0.03, 0.82, 0.11, 0.04]),
+            'conversion_status': np.where(converted, 'converted', 'not_converted'),
+        }).to_csv(path, index=False, mode='a' if start else 'w', header=not start)
+
+
+def notebook_analysis(path):
+    """The notebook's cells, on the whole file in memory."""
+    df = pd.read_csv(path)
+    df_filtered = df[~df['previous_campaign_outcome'].isin(['other_outcome', 'unidentified'])].copy()
+    df_filtered.loc[:, 'call_frequency_group'] = pd.cut(df_filtered['call_frequency'], bins=FREQUENCY_BINS,
+                                                        labels=FREQUENCY_LABELS, right=False)
+    changed_customers = df_filtered[(df_filtered['previous_campaign_outcome'] == 'unsuccessful')
+                                    & (df_filtered['conversion_status'] == 'converted')].copy()
+    changed_customers['call_duration_group'] = pd.cut(changed_customers['call_duration'], bins=DURATION_BINS,
+                                                      labels=DURATION_LABELS, right=False)
+    converted = df[df['conversion_status'] == 'converted']['call_duration']
+    not_converted = df[df['conversion_status'] == 'not_converted']['call_duration']
+    return {
+        'outcome_counts': df_filtered['previous_campaign_outcome'].value_counts().sort_index(),
+        'cross_tab': pd.crosstab(df_filtered['previous_campaign_outcome'], df_filtered['conversion_status']),
+        'conversion_rates': (df_filtered.groupby('call_frequency_group', observed=True)['conversion_status']
+                             .value_counts(normalize=True).unstack() * 100).round(2),
+        'changed_customer_durations': changed_customers['call_duration_group'].value_counts().sort_index(),
+        'success_count_by_month': df[df['previous_campaign_outcome'] == 'successful'].groupby('call_month').size(),
+        'month_counts': df['call_month'].value_counts().sort_index(),
+        'education_conversion': pd.crosstab(df['education_level'], df['conversion_status']),
+        'duration_stats': df.groupby('conversion_status')['call_duration'].describe(),
+        'duration_ttest': tuple(ttest_ind(converted, not_converted, equal_var=False)),
+    }
+
+
+def summary_analysis(summary):
+    return {name: tuple(getattr(summary, name)()) if name == 'duration_ttest' else getattr(summary, name)()
+            for name in ('outcome_counts', 'cross_tab', 'conversion_rates', 'changed_customer_durations',
+                         'success_count_by_month', 'month_counts', 'education_conversion', 'duration_stats',
+                         'duration_ttest')}
+
+
+def assert_same(expected, actual):
+    for name, value in expected.items():
+        if isinstance(value, tuple):
+            np.testing.assert_allclose(actual[name], value, rtol=1e-6)
+        elif isinstance(value, pd.Series):
+            pd.testing.assert_series_equal(value, actual[name], check_dtype=False, check_names=False,
+                                           check_index_type=False, check_categorical=False)
+        else:
+            pd.testing.assert_frame_equal(value, actual[name], check_dtype=False, check_names=False,
+                                          check_index_type=False, check_column_type=False, check_categorical=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--piece-mb', type=float, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'dataset.KEGGEL.csv')
+        write_campaign_data(path, args.rows)
+        print(f'{args.rows:,} rows, {os.path.getsize(path) / 2 ** 20:.0f} MB')
+
+        expected, notebook_seconds = timed(notebook_analysis, path)
+        piece_bytes = int(args.piece_mb * 2 ** 20)
+        serial, serial_seconds = timed(summarize, path, piece_bytes)
+        parallel, parallel_seconds = timed(summarize, path, piece_bytes, args.processes)
+        assert_same(expected, summary_analysis(serial))
+        assert_same(expected, summary_analysis(parallel))
+
+    print(f'notebook, in memory:       {notebook_seconds:8.2f} s')
+    print(f'pipeline, 1 process:       {serial_seconds:8.2f} s')
+    print(f'pipeline, {args.processes:2d} processes:    {parallel_seconds:8.2f} s')
+    print(f'summary: {len(serial.counts):,} count cells, {len(serial.durations):,} duration cells')
@@ -0,0 +1,61 @@
+"""Bytes on the wire and JSON encode time per dashboard callback, before and after minimize_figure.
+
+Loads both apps with their configured data (see data_loading.configured_path),
+so point MOUSE_METADATA_CSV, STUDY_RESULTS_CSV and WORLD_DATA_CSV at the CSVs.
+
+"Before" is the plain figure dict with the shared layout (template, common
+mouse layout) included, as the callbacks used to send it; "after" is what
+they send now. Both are dicts, so the encode times compare payloads rather
+than plotly's figure validation. The shared layouts go out once per page.
+
+    python benchmarks/bench_figure_payload.py
+"""
+import inspect
+import os
+import sys
+import time
+
+from plotly.io.json import to_json_plotly
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+os.environ.setdefault('WORLD_PREBUILD', '0')
+
+import dash_app_mous  # noqa: E402
+from figure_payload import minimize_figure  # noqa: E402
+from wsgi import load_script  # noqa: E402
+
+
+def encode_seconds(figure, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        payload = to_json_plotly(figure)
+    return len(payload), (time.perf_counter() - start) / repeat
+
+
+def report(name, builder, args, shared_layout):
+    before = inspect.unwrap(builder)(*args)
+    before = before.to_plotly_json() if hasattr(before, 'to_plotly_json') else dict(before)
+    before['layout'] = {**shared_layout, **before.get('layout', {})}
+    after = minimize_figure(before, shared_layout)
+    bytes_before, seconds_before = encode_seconds(before)
+    bytes_after, seconds_after = encode_seconds(after)
+    print(f'{name:32s} {bytes_before:>10,} {bytes_after:>10,} {bytes_before / bytes_after:6.1f}x'
+          f' {seconds_before * 1e3:9.2f} {seconds_after * 1e3:9.2f}')
+
+
+if __name__ == '__main__':
+    world = load_script('world_data_2023.app.py', 'world_data_2023_app')
+    all_drugs = sorted(drug for group in dash_app_mous.drug_groups.values() for drug in group)
+    all_groups = sorted(dash_app_mous.drug_groups)
+    mouse_layout = dash_app_mous.graph_layout
+    print(f'{"callback":32s} {"bytes":>10s} {"minimized":>10s} {"":7s} {"ms":>9s} {"ms min.":>9s}')
+    report('update_weight_histogram', dash_app_mous.update_weight_histogram, [all_drugs], mouse_layout)
+    report('update_weight_distribution', dash_app_mous.update_weight_distribution, ['Placebo'], mouse_layout)
+    report('update_survival_function', dash_app_mous.update_survival_function, [all_groups], mouse_layout)
+    report('update_survival_function_time', dash_app_mous.update_survival_function_time, [all_groups], mouse_layout)
+    for graph_id, builder in world.panels.items():
+        # The map is patched in place and keeps its template
+        report(graph_id, builder, [[]], world.shared_layout if graph_id != 'choropleth-map' else {})
+    print(f'shared layout, once per page: mouse {len(to_json_plotly(mouse_layout)):,} bytes,'
+          f' world {len(to_json_plotly(world.shared_layout)):,} bytes')
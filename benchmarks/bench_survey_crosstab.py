@@ -0,0 +1,73 @@
+"""Compare the one-pass survey crosstabs with the notebooks' groupby/value_counts per question.
+
+Builds a synthetic weather-check survey (1M respondents by default) and counts
+every question by every demographic both ways, checking the tables agree.
+
+    python benchmarks/bench_survey_crosstab.py [rows]
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_world_cleaning import timed  # noqa: E402
+from survey_crosstab import SKIPPED_LABEL, SurveyCrosstab  # noqa: E402
+
+ANSWERS = {
+    'Question 1': ['Yes', 'No'],
+    'Question 2': ['The default weather app on your phone', 'Local TV News', 'Radio weather',
+                   'A specific website or app (please provide the answer)', 'Internet search', 'Newspaper'],
+    'Question 4': ['Very likely', 'Somewhat likely', 'Somewhat unlikely', 'Very unlikely'],
+    'Question 5': ['18 - 29', '30 - 44', '45 - 59', '60+'],
+    'Question 6': ['Male', 'Female'],
+    'Question 7': ['$0 to $9,999', '$10,000 to $24,999', '$25,000 to $49,999', '$50,000 to $74,999',
+                   '$75,000 to $99,999', '$100,000 to $124,999', '$125,000 to $149,999', '$150,000 to $174,999',
+                   '$175,000 to $199,999', '$200,000 and up'],
+    'US Region': ['Pacific', 'Mountain', 'West North Central', 'West South Central', 'East North Central',
+                  'East South Central', 'South Atlantic', 'Middle Atlantic', 'New England'],
+}
+GROUPS = ['US Region', 'Question 5', 'Question 6', 'Question 7']
+QUESTIONS = ['Question 1', 'Question 2', 'Question 4']
+
+
+def synthetic_survey(rows, seed=0, skipped=0.05):
+    rng = np.random.default_rng(seed)
+    data = {'RespondentID': np.arange(rows)}
+    for column, answers in ANSWERS.items():
+        values = rng.choice(np.array(answers, dtype=object), rows)
+        values[rng.random(rows) < skipped] = SKIPPED_LABEL
+        data[column] = values
+    return pd.DataFrame(data)
+
+
+def groupby_crosstabs(df, pairs):
+    """What the notebooks do for each pair: two value_counts, unstacked."""
+    tables = {}
+    for group, question in pairs:
+        grouped = df.groupby(group)[[question]]
+        percentages = grouped.value_counts(normalize=True).unstack().fillna(0) * 100
+        counts = grouped.value_counts().unstack().fillna(0)
+        tables[(group, question)] = counts, percentages
+    return tables
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = synthetic_survey(rows)
+    pairs = [(group, question) for group in GROUPS for question in QUESTIONS]
+    print(f'{rows:,} respondents, {len(pairs)} question x demographic pairs')
+
+    legacy, legacy_seconds = timed(groupby_crosstabs, df, pairs)
+    one_pass, one_pass_seconds = timed(lambda: SurveyCrosstab(df).crosstabs(pairs))
+    _, cached_seconds = timed(lambda crosstab: crosstab.crosstabs(pairs), SurveyCrosstab(df))
+
+    for pair in pairs:
+        for expected, actual in zip(legacy[pair], one_pass[pair]):
+            pd.testing.assert_frame_equal(expected, actual, check_dtype=False, check_index_type=False,
+                                          check_column_type=False)
+    print(f'groupby per pair:  {legacy_seconds:8.2f} s')
+    print(f'one pass:          {one_pass_seconds:8.2f} s  ({legacy_seconds / one_pass_seconds:.1f}x, with encoding)')
+    print(f'one pass, encoded: {cached_seconds:8.2f} s')
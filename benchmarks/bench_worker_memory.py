@@ -0,0 +1,112 @@
+"""Startup time and memory per gunicorn worker: per-worker import vs. preload with mapped snapshots.
+
+Writes synthetic CSVs (see bench_callbacks) and starts the app under gunicorn
+with gunicorn.conf.py twice, from an empty snapshot directory each time:
+
+* per-worker import: no preload, Parquet snapshots, so every worker loads and
+  cleans the data itself (what running the apps under gunicorn did before);
+* preload + mmap: the master builds the Arrow snapshot once, the workers are
+  forked from it and share the memory-mapped frames.
+
+Startup time is until every worker has loaded the app. RSS counts shared pages
+in full for every process; PSS splits them between the processes sharing them,
+so the total PSS is what the server really costs. Needs gunicorn and Linux.
+
+    python benchmarks/bench_worker_memory.py [--app mouse|world] [--rows 1000000] [--workers 4]
+"""
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_callbacks import write_mouse_study, write_world_data  # noqa: E402
+
+MODES = {
+    'per-worker import': {'DASH_PRELOAD': '0', 'DATA_SNAPSHOT_MMAP': '0'},
+    'preload + mmap': {'DASH_PRELOAD': '1', 'DATA_SNAPSHOT_MMAP': '1'},
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def memory(pid):
+    """RSS and PSS of a process in bytes, from /proc/<pid>/smaps_rollup."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as file:
+        for line in file:
+            match = re.match(r'(Rss|Pss):\s+(\d+) kB', line)
+            if match:
+                values[match.group(1)] = int(match.group(2)) * 1024
+    return values['Rss'], values['Pss']
+
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as file:
+        return [int(child) for child in file.read().split()]
+
+
+def run_mode(app, env, workers, timeout=600):
+    port = free_port()
+    log_path = os.path.join(env['DATA_SNAPSHOT_DIR'], 'gunicorn.log')
+    os.makedirs(env['DATA_SNAPSHOT_DIR'], exist_ok=True)
+    with open(log_path, 'w') as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}',
+             '--workers', str(workers), '--timeout', str(timeout)],
+            cwd=ROOT, env=dict(env, DASH_WSGI_APP=f'wsgi:{app}_server()'), stdout=log, stderr=subprocess.STDOUT)
+        try:
+            while True:
+                with open(log_path) as file:
+                    ready = file.read().count('Worker ready')
+                if ready >= workers:
+                    break
+                if process.poll() is not None or time.perf_counter() - start > timeout:
+                    raise RuntimeError(f'gunicorn did not start, see {log_path}')
+                time.sleep(0.05)
+            startup = time.perf_counter() - start
+            # Serve a few pages so every worker has touched the data it uses
+            for _ in range(4 * workers):
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/').read()
+            master = memory(process.pid)
+            worker_memory = [memory(pid) for pid in children(process.pid)]
+        finally:
+            process.terminate()
+            process.wait()
+    return startup, master, worker_memory
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--app', choices=['mouse', 'world'], default='mouse')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        metadata_path, results_path = write_mouse_study(directory, args.rows)
+        world_path = write_world_data(directory, args.rows) if args.app == 'world' else None
+        base_env = dict(os.environ, MOUSE_METADATA_CSV=metadata_path, STUDY_RESULTS_CSV=results_path,
+                        WORLD_DATA_CSV=world_path or '', WORLD_PREBUILD='0')
+        print(f'{args.app} app, {args.rows:,} rows, {args.workers} workers')
+        print(f'{"mode":20s} {"startup":>9s} {"worker RSS":>11s} {"worker PSS":>11s} {"total PSS":>10s}')
+        for mode, mode_env in MODES.items():
+            env = dict(base_env, DATA_SNAPSHOT_DIR=os.path.join(directory, mode.replace(' ', '_')), **mode_env)
+            startup, master, worker_memory = run_mode(args.app, env, args.workers)
+            worker_rss = sum(rss for rss, _ in worker_memory) / len(worker_memory)
+            worker_pss = sum(pss for _, pss in worker_memory) / len(worker_memory)
+            total_pss = master[1] + sum(pss for _, pss in worker_memory)
+            print(f'{mode:20s} {startup:8.1f}s {worker_rss / 2 ** 20:8.0f} MB {worker_pss / 2 ** 20:8.0f} MB'
+                  f' {total_pss / 2 ** 20:7.0f} MB')
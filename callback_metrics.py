@@ -0,0 +1,205 @@
+import contextlib
+import contextvars
+import cProfile
+import functools
+import os
+import random
+import threading
+import time
+
+from flask import Response, g, has_request_context
+
+# Upper bounds (seconds) of the latency histogram buckets
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+current_call = contextvars.ContextVar('current_call', default=None)
+
+
+class CallTimings:
+    """Seconds spent in each named phase during one instrumented callback call."""
+
+    def __init__(self):
+        self.phases = {}
+        self.active = set()
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Attribute the time spent in the block to ``name`` for the callback being instrumented.
+
+    Outside an instrumented callback, or nested in a block of the same phase,
+    this does nothing.
+    """
+    timings = current_call.get()
+    if timings is None or name in timings.active:
+        yield
+        return
+    timings.active.add(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.active.discard(name)
+        timings.add(name, time.perf_counter() - start)
+
+
+def timed_phase(name):
+    """Decorator form of ``phase``."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+
+class CallbackMetrics:
+    """Per-callback, per-phase latency histograms for a Dash app, served in Prometheus format.
+
+    ``instrument`` wraps a callback: time spent in ``phase('filter')`` blocks is
+    recorded as ``filter``, the rest of the call as ``build``, and the time from
+    the callback returning until Flask sends the response as ``serialize``.
+    With ``profile_sample_rate`` > 0 a share of the calls run under a profiler
+    and those slower than ``profile_threshold`` seconds are written to
+    ``profile_dir`` (cProfile ``.prof`` files, or pyinstrument HTML). Calls
+    sampled while another profiler is active run unprofiled.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, profile_dir=None, profile_threshold=0.5,
+                 profile_sample_rate=0.0, profiler='cprofile'):
+        self.buckets = buckets
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.profile_dir = profile_dir
+        self.profile_threshold = profile_threshold
+        self.profile_sample_rate = profile_sample_rate if profile_dir else 0.0
+        self.profiler = profiler
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            profile_dir=os.environ.get('CALLBACK_PROFILE_DIR'),
+            profile_threshold=float(os.environ.get('CALLBACK_PROFILE_THRESHOLD', 0.5)),
+            profile_sample_rate=float(os.environ.get('CALLBACK_PROFILE_SAMPLE', 0.0)),
+            profiler=os.environ.get('CALLBACK_PROFILER', 'cprofile')
+        )
+
+    def observe(self, callback, phase_name, seconds):
+        with self.lock:
+            histogram = self.histograms.get((callback, phase_name))
+            if histogram is None:
+                histogram = self.histograms[(callback, phase_name)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def instrument(self, func):
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = CallTimings()
+            token = current_call.set(timings)
+            profiler = self.start_profiler()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                current_call.reset(token)
+                self.stop_profiler(profiler, name, elapsed)
+                for phase_name, seconds in timings.phases.items():
+                    self.observe(name, phase_name, seconds)
+                self.observe(name, 'build', max(elapsed - sum(timings.phases.values()), 0.0))
+                if has_request_context():
+                    g.instrumented_callback = (name, time.perf_counter())
+
+        return wrapper
+
+    def start_profiler(self):
+        if not self.profile_sample_rate or random.random() >= self.profile_sample_rate:
+            return None
+        if self.profiler == 'pyinstrument':
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            start = profiler.start
+        else:
+            profiler = cProfile.Profile()
+            start = profiler.enable
+        try:
+            start()
+        except (ValueError, RuntimeError):
+            # From Python 3.12 only one cProfile can be active per process, so a call
+            # sampled while another one is being profiled runs unprofiled
+            return None
+        return profiler
+
+    def stop_profiler(self, profiler, name, elapsed):
+        if profiler is None:
+            return
+        if self.profiler == 'pyinstrument':
+            profiler.stop()
+        else:
+            profiler.disable()
+        if elapsed < self.profile_threshold:
+            return
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stem = os.path.join(self.profile_dir, f'{name}-{time.strftime("%Y%m%d-%H%M%S")}-{int(elapsed * 1000)}ms')
+        if self.profiler == 'pyinstrument':
+            with open(f'{stem}.html', 'w') as file:
+                file.write(profiler.output_html())
+        else:
+            profiler.dump_stats(f'{stem}.prof')
+
+    def render(self):
+        lines = [
+            '# HELP dash_callback_phase_seconds Time spent per Dash callback phase.',
+            '# TYPE dash_callback_phase_seconds histogram',
+        ]
+        with self.lock:
+            for (callback, phase_name), histogram in sorted(self.histograms.items()):
+                labels = f'callback="{callback}",phase="{phase_name}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f'dash_callback_phase_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'dash_callback_phase_seconds_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                lines.append(f'dash_callback_phase_seconds_sum{{{labels}}} {histogram.sum}')
+                lines.append(f'dash_callback_phase_seconds_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def init_app(self, app):
+        """Serve ``/metrics`` and record the serialize phase on ``app``'s Flask server."""
+        server = app.server
+
+        @server.route('/metrics')
+        def metrics():
+            return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+        @server.after_request
+        def record_serialize(response):
+            callback = g.pop('instrumented_callback', None)
+            if callback is not None:
+                name, returned = callback
+                self.observe(name, 'serialize', time.perf_counter() - returned)
+            return response
+
+        return self
@@ -0,0 +1,314 @@
+"""One-pass, chunked version of the analysis in DATA_viz_Individual_Project.ipynb.
+
+The bank-marketing campaign CSV is read in pieces of about ``--piece-mb``
+megabytes, optionally spread over ``--processes`` worker processes, and each
+piece is reduced to counts that merge by addition. The notebook's crosstab,
+call-frequency and call-duration buckets, conversion rates, monthly success
+counts and call-duration statistics are all answered from those counts, so
+memory stays bounded however large the export is.
+
+    python campaign_pipeline.py dataset.KEGGEL.csv [--processes 4] [--figures out/]
+"""
+import argparse
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from scipy.stats import ttest_ind_from_stats
+
+CAMPAIGN_DTYPES = {
+    'call_month': 'str',
+    'education_level': 'str',
+    'call_duration': 'int64',
+    'call_frequency': 'int64',
+    'previous_campaign_outcome': 'str',
+    'conversion_status': 'str',
+}
+
+# The notebook's df_filtered drops these outcomes
+EXCLUDED_OUTCOMES = ['other_outcome', 'unidentified']
+
+FREQUENCY_BINS = [0, 2, 4, float('inf')]
+FREQUENCY_LABELS = ['up to 2 calls', '3 - 4 calls', '4 and more calls']
+DURATION_BINS = [0, 100, 200, 300, 400, float('inf')]
+DURATION_LABELS = ['0-100 sec', '101-200 sec', '201-300 sec', '301-400 sec', '400+ sec']
+
+
+def add_counts(total, counts):
+    if total is None:
+        return counts
+    return total.add(counts, fill_value=0).astype('int64')
+
+
+def weighted_quantile(values, counts, q):
+    """``np.quantile`` (linear interpolation) of ``values`` repeated ``counts`` times."""
+    cumulative = np.cumsum(counts)
+    position = (cumulative[-1] - 1) * q
+    lower = values[np.searchsorted(cumulative, np.floor(position), side='right')]
+    upper = values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+    return lower + (upper - lower) * (position - np.floor(position))
+
+
+class CampaignSummary:
+    """Row counts of the campaign data, updated one chunk at a time.
+
+    ``counts`` is indexed by every combination of outcome, conversion status,
+    call-frequency group, call month, education level and call-duration group
+    that occurs, and ``durations`` by conversion status and call duration in
+    seconds. Both are plain counts, so summaries built on separate chunks or
+    workers merge by adding them.
+    """
+
+    def __init__(self):
+        self.counts = None
+        self.durations = None
+
+    def update(self, chunk):
+        groups = [
+            chunk['previous_campaign_outcome'], chunk['conversion_status'],
+            pd.cut(chunk['call_frequency'], bins=FREQUENCY_BINS, labels=FREQUENCY_LABELS, right=False)
+            .astype(object).rename('call_frequency_group'),
+            chunk['call_month'], chunk['education_level'],
+            pd.cut(chunk['call_duration'], bins=DURATION_BINS, labels=DURATION_LABELS, right=False)
+            .astype(object).rename('call_duration_group'),
+        ]
+        # dropna=False keeps the rows outside the buckets, which the notebook counts everywhere else
+        self.counts = add_counts(self.counts, chunk.groupby(groups, dropna=False).size())
+        self.durations = add_counts(self.durations, chunk.groupby(['conversion_status', 'call_duration']).size())
+        return self
+
+    def merge(self, other):
+        if other.counts is not None:
+            self.counts = add_counts(self.counts, other.counts)
+            self.durations = add_counts(self.durations, other.durations)
+        return self
+
+    def count_by(self, levels, counts=None):
+        counts = self.counts if counts is None else counts
+        return counts.groupby(level=levels).sum()
+
+    @property
+    def filtered_counts(self):
+        outcomes = self.counts.index.get_level_values('previous_campaign_outcome')
+        return self.counts[~outcomes.isin(EXCLUDED_OUTCOMES)]
+
+    def outcome_counts(self):
+        """Rows of df_filtered per previous campaign outcome."""
+        return self.count_by('previous_campaign_outcome', self.filtered_counts)
+
+    def cross_tab(self):
+        """``pd.crosstab`` of previous outcome and conversion status over df_filtered."""
+        return self.count_by(['previous_campaign_outcome', 'conversion_status'], self.filtered_counts) \
+            .unstack(fill_value=0)
+
+    def conversion_rates(self):
+        """Percentage of each conversion status per call-frequency group, over df_filtered."""
+        counts = self.count_by(['call_frequency_group', 'conversion_status'], self.filtered_counts) \
+            .unstack(fill_value=0)
+        counts = counts.reindex([label for label in FREQUENCY_LABELS if label in counts.index])
+        return (counts.div(counts.sum(axis=1), axis=0) * 100).round(2)
+
+    def changed_customer_durations(self):
+        """Call-duration groups of the customers who were unsuccessful before and converted now."""
+        counts = self.filtered_counts.xs(('unsuccessful', 'converted'),
+                                         level=['previous_campaign_outcome', 'conversion_status'])
+        return self.count_by('call_duration_group', counts).reindex(DURATION_LABELS, fill_value=0)
+
+    def success_count_by_month(self):
+        """Customers with a successful previous outcome per call month, over all rows."""
+        counts = self.counts.xs('successful', level='previous_campaign_outcome')
+        return self.count_by('call_month', counts)
+
+    def month_counts(self):
+        return self.count_by('call_month')
+
+    def education_conversion(self):
+        return self.count_by(['education_level', 'conversion_status']).unstack(fill_value=0)
+
+    def duration_stats(self):
+        """``df.groupby('conversion_status')['call_duration'].describe()``."""
+        stats = {}
+        for status, counts in self.durations.groupby(level='conversion_status'):
+            values = counts.index.get_level_values('call_duration').to_numpy(dtype=float)
+            weights = counts.to_numpy()
+            n = weights.sum()
+            mean = (values * weights).sum() / n
+            std = np.sqrt((weights * (values - mean) ** 2).sum() / (n - 1)) if n > 1 else np.nan
+            stats[status] = {
+                'count': float(n), 'mean': mean, 'std': std, 'min': values[0],
+                **{f'{q:.0%}': weighted_quantile(values, weights, q) for q in (0.25, 0.5, 0.75)},
+                'max': values[-1],
+            }
+        return pd.DataFrame.from_dict(stats, orient='index').rename_axis('conversion_status')
+
+    def duration_ttest(self):
+        """Welch's t-test of call duration, converted against not converted customers."""
+        stats = self.duration_stats()
+        converted, not_converted = stats.loc['converted'], stats.loc['not_converted']
+        return ttest_ind_from_stats(converted['mean'], converted['std'], converted['count'],
+                                    not_converted['mean'], not_converted['std'], not_converted['count'],
+                                    equal_var=False)
+
+
+def file_pieces(path, piece_bytes):
+    """The header line and ``(start, end)`` byte ranges of about ``piece_bytes``, ending at line breaks."""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as file:
+        header = file.readline()
+        start = file.tell()
+        pieces = []
+        while start < size:
+            file.seek(min(start + piece_bytes, size))
+            file.readline()
+            end = min(file.tell(), size)
+            pieces.append((start, end))
+            start = end
+    return header, pieces
+
+
+def summarize_piece(path, header, start, end):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        data = file.read(end - start)
+    chunk = pd.read_csv(io.BytesIO(header + data), usecols=list(CAMPAIGN_DTYPES), dtype=CAMPAIGN_DTYPES)
+    return CampaignSummary().update(chunk)
+
+
+def summarize(path, piece_bytes=64 * 2 ** 20, processes=1):
+    """Summarize the campaign CSV at ``path`` piece by piece, in ``processes`` worker processes if more than one.
+
+    Records must not contain line breaks inside quoted fields, as pieces are cut at line breaks.
+    """
+    header, pieces = file_pieces(path, piece_bytes)
+    summary = CampaignSummary()
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(summarize_piece, path, header, start, end) for start, end in pieces]
+            for future in as_completed(futures):
+                summary.merge(future.result())
+    else:
+        for start, end in pieces:
+            summary.merge(summarize_piece(path, header, start, end))
+    return summary
+
+
+def duration_box(values, counts, label):
+    """``Axes.bxp`` statistics of repeated values, with the 1.5 IQR whiskers of ``boxplot``."""
+    q1, median, q3 = (weighted_quantile(values, counts, q) for q in (0.25, 0.5, 0.75))
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    inside = values[(values >= low) & (values <= high)]
+    return {'label': label, 'med': median, 'q1': q1, 'q3': q3, 'whislo': inside.min(), 'whishi': inside.max(),
+            'fliers': values[(values < low) | (values > high)]}
+
+
+def plot_campaign(summary):
+    """The notebook's figures, drawn from the summary; returns them by name."""
+    sns.set(style="whitegrid")
+    figures = {}
+
+    outcomes = summary.outcome_counts()
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.barplot(x=outcomes.index, y=outcomes.to_numpy(), hue=outcomes.index, palette='Set2', legend=False, ax=ax)
+    ax.set_title('Distribution of Previous Campaign Outcomes', fontsize=14)
+    ax.set_xlabel('Outcome', fontsize=12)
+    ax.set_ylabel('Count', fontsize=12)
+    total_count = outcomes.sum()
+    for p in ax.patches:
+        height = p.get_height()
+        ax.text(p.get_x() + p.get_width() / 2., height + 0.5, f'{height / total_count:.1%}', ha='center')
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+    fig.tight_layout()
+    figures['previous_outcomes'] = fig
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    sns.heatmap(summary.cross_tab(), annot=True, fmt='d', cmap='coolwarm', linewidths=1, linecolor='black', ax=ax)
+    ax.set_title('Cross-tabulation of Previous Campaign Outcome and Conversion Status', fontsize=14)
+    ax.set_xlabel('Conversion Status', fontsize=12)
+    ax.set_ylabel('Previous Campaign Outcome', fontsize=12)
+    fig.tight_layout()
+    figures['outcome_conversion'] = fig
+
+    success_count_by_month = summary.success_count_by_month()
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(success_count_by_month.index, success_count_by_month.to_numpy(), marker='o', linestyle='-')
+    ax.set_title('Successful Conversions Over Time')
+    ax.set_xlabel('Month')
+    ax.set_ylabel('Count of Successful Conversions')
+    plt.setp(ax.get_xticklabels(), rotation=45)
+    ax.grid(True)
+    fig.tight_layout()
+    figures['success_by_month'] = fig
+
+    months = summary.month_counts()
+    fig, ax = plt.subplots()
+    sns.barplot(x=months.index, y=months.to_numpy(), ax=ax)
+    plt.setp(ax.get_xticklabels(), rotation=90)
+    ax.set_xlabel('Call month')
+    ax.set_ylabel('Count')
+    ax.set_title('Distribution of Call month')
+    fig.tight_layout()
+    figures['call_month'] = fig
+
+    education = summary.education_conversion().stack().rename('count').reset_index()
+    fig, ax = plt.subplots()
+    sns.barplot(data=education, x='education_level', y='count', hue='conversion_status', ax=ax)
+    ax.set_title('Conversion Status by Education Level')
+    ax.set_xlabel('Education Level')
+    ax.set_ylabel('Count')
+    figures['education_conversion'] = fig
+
+    durations = {status: (counts.index.get_level_values('call_duration').to_numpy(), counts.to_numpy())
+                 for status, counts in summary.durations.groupby(level='conversion_status')}
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.bxp([duration_box(values, counts, status) for status, (values, counts) in durations.items()])
+    ax.set_title('Call Duration Distribution by Conversion Status')
+    ax.set_xlabel('Conversion Status')
+    ax.set_ylabel('Call Duration (seconds)')
+    figures['duration_box'] = fig
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for status, color, label in (('converted', 'blue', 'Converted'), ('not_converted', 'orange', 'Not Converted')):
+        values, counts = durations[status]
+        sns.histplot(x=values, weights=counts, bins=60, kde=True, color=color, label=label, ax=ax)
+    ax.set_title('Histogram of Call Durations by Conversion Status')
+    ax.set_xlabel('Call Duration')
+    ax.set_ylabel('Frequency')
+    ax.legend()
+    figures['duration_histogram'] = fig
+    return figures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Summarize a bank-marketing campaign CSV in one chunked pass.')
+    parser.add_argument('path')
+    parser.add_argument('--piece-mb', type=float, default=64)
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--figures', help='Save the figures as PNGs in this directory instead of showing them')
+    args = parser.parse_args()
+
+    summary = summarize(args.path, int(args.piece_mb * 2 ** 20), args.processes)
+    outcomes = summary.outcome_counts()
+    print("Total number of successful conversions:", outcomes.get('successful', 0))
+    print("Total number of unsuccessful conversions:", outcomes.get('unsuccessful', 0))
+    print("Cross-tabulation of Previous Campaign Outcome and Conversion Status:")
+    print(summary.cross_tab())
+    print(summary.conversion_rates())
+    print(summary.changed_customer_durations())
+    for month, count in summary.success_count_by_month().items():
+        print(f"{month}: {count} Successfuls")
+    print(summary.duration_stats())
+    t_stat, p_value = summary.duration_ttest()
+    print(f"T-statistic: {t_stat:.2f}")
+    print(f"P-value: {p_value:.4f}")
+
+    figures = plot_campaign(summary)
+    if args.figures:
+        os.makedirs(args.figures, exist_ok=True)
+        for name, fig in figures.items():
+            fig.savefig(os.path.join(args.figures, f'{name}.png'))
+    else:
+        plt.show()
@@ -1,18 +1,202 @@
+import os
+import threading
+import zlib
+
 import dash
 from dash import dcc, html
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State
 import pandas as pd
 import numpy as np
+import plotly.colors
 import plotly.graph_objects as go
 
-# Load data
-mouse_data = pd.read_csv("C:/Users/HP/Desktop/PYTHON/Homework_dash_mouse/Mouse_metadata.csv")
-study_results = pd.read_csv("C:/Users/HP/Desktop/DATA__VIZUALI/Study_results.csv")
-merged_df = pd.merge(mouse_data, study_results, on='Mouse ID')
+from callback_metrics import CallbackMetrics, timed_phase
+from data_loading import (MOUSE_METADATA_DTYPES, STUDY_RESULTS_DTYPES, cached_frames, configured_path,
+                          read_mouse_study)
+from figure_cache import FigureCache
+from figure_payload import figure_store_id, minimized, shared_layout_graph
+from live_data import LiveReloader
+from mouse_survival import exit_curves, mice_at_risk, mouse_exits
+from study_store import DuckDBStudyIndex, weight_bins
+
+# Data files: --mouse-metadata/--study-results, then the environment, then the original paths
+metadata_path = configured_path('mouse-metadata', 'MOUSE_METADATA_CSV',
+                                "C:/Users/HP/Desktop/PYTHON/Homework_dash_mouse/Mouse_metadata.csv")
+results_path = configured_path('study-results', 'STUDY_RESULTS_CSV',
+                               "C:/Users/HP/Desktop/DATA__VIZUALI/Study_results.csv")
+
+# Weight charts are binned on the server and sent as bar counts
+weight_bin_width = float(os.environ.get('MOUSE_WEIGHT_BIN_WIDTH', 1.0))
+
+# 'pandas' (default) loads the merged study into memory; 'duckdb' queries
+# Parquet copies of the two tables instead, for studies larger than RAM
+study_backend = os.environ.get('MOUSE_STUDY_BACKEND', 'pandas')
+
+
+class StudyIndex:
+    """Per-regimen views of the study data, built once at startup.
+
+    Callbacks look up a regimen's weight histogram, per-timepoint counts and
+    survival curve here instead of scanning ``merged_df`` with a boolean mask
+    on every request. Weights are binned into ``bin_width`` wide bins shared by
+    every regimen, so a weight chart only needs the bin counts.
+
+    Rows appended to the CSVs are folded in with ``append_metadata`` and
+    ``append_results``, which update only the regimens the rows touch.
+    """
+
+    def __init__(self, merged_df, mouse_data, bin_width=1.0):
+        self.lock = threading.Lock()
+        self.timepoint_counts = mice_at_risk(merged_df)
+        self.per_mouse = mouse_exits(merged_df)
+        self.survival_curves = exit_curves(self.per_mouse)
+        self.mice = mouse_data.set_index('Mouse ID')[['Drug Regimen', 'Weight (g)']]
+        # Results of mice whose metadata has not been appended yet
+        self.pending = pd.DataFrame(columns=list(STUDY_RESULTS_DTYPES))
+
+        self.bin_width = bin_width
+        self.regimens = sorted(mouse_data['Drug Regimen'].dropna().unique())
+        weights = mouse_data['Weight (g)'].dropna()
+        self.bin_start, self.bin_edges, self.bin_centers = weight_bins(weights.min(), weights.max(), bin_width)
+
+        self.weight_counts = {
+            drug: self.bin_weights(frame['Weight (g)'])
+            for drug, frame in merged_df.groupby('Drug Regimen', sort=False, observed=True)
+        }
+        self.mouse_weight_counts = {
+            drug: self.bin_weights(frame['Weight (g)'])
+            for drug, frame in mouse_data.groupby('Drug Regimen', sort=False, observed=True)
+        }
+        self.all_mouse_weight_counts = self.bin_weights(weights)
+
+    def bin_weights(self, weights):
+        weights = weights.dropna().to_numpy()
+        positions = ((weights - self.bin_start) // self.bin_width).astype(np.int64)
+        return np.bincount(positions, minlength=len(self.bin_centers))
+
+    def in_bins(self, weights):
+        weights = weights.dropna()
+        return bool(((weights >= self.bin_edges[0]) & (weights < self.bin_edges[-1])).all())
+
+    def append_metadata(self, mouse_data):
+        """Add new mice; False if the rows need a full reload (new weight range or a known mouse)."""
+        mouse_data = mouse_data.astype({'Drug Regimen': 'str'})
+        if not self.in_bins(mouse_data['Weight (g)']) or mouse_data['Mouse ID'].isin(self.mice.index).any():
+            return False
+        with self.lock:
+            self.mice = pd.concat([self.mice, mouse_data.set_index('Mouse ID')[['Drug Regimen', 'Weight (g)']]])
+            self.regimens = sorted(set(self.regimens) | set(mouse_data['Drug Regimen'].dropna()))
+            for drug, frame in mouse_data.groupby('Drug Regimen', sort=False, observed=True):
+                self.mouse_weight_counts[drug] = self.regimen_mouse_weight_counts(drug) + self.bin_weights(
+                    frame['Weight (g)'])
+            self.all_mouse_weight_counts = self.all_mouse_weight_counts + self.bin_weights(mouse_data['Weight (g)'])
+            pending, self.pending = self.pending, self.pending.iloc[:0]
+        return self.append_results(pending)
+
+    def append_results(self, study_results):
+        """Fold new timepoint measurements into the weight, timepoint and survival counts."""
+        with self.lock:
+            study_results = pd.concat([self.pending, study_results]) if len(self.pending) else study_results
+            known = study_results['Mouse ID'].isin(self.mice.index)
+            self.pending = study_results[~known]
+            rows = study_results[known].join(self.mice, on='Mouse ID')
+            if rows.empty:
+                return True
+
+            for drug, frame in rows.groupby('Drug Regimen', sort=False, observed=True):
+                self.weight_counts[drug] = self.regimen_weight_counts(drug) + self.bin_weights(frame['Weight (g)'])
+                counts = frame.groupby('Timepoint').size()
+                self.timepoint_counts[drug] = self.regimen_timepoint_counts(drug).add(
+                    counts, fill_value=0).astype('int64').sort_index()
+
+            # Only the curves of regimens with new exits change, unless the study got longer
+            final = self.per_mouse['exit'].max()
+            latest = rows.groupby('Mouse ID', observed=True).agg(regimen=('Drug Regimen', 'first'), exit=('Timepoint', 'max'))
+            latest['exit'] = np.fmax(latest['exit'], self.per_mouse['exit'].reindex(latest.index)).astype(
+                self.per_mouse['exit'].dtype)
+            self.per_mouse = latest.combine_first(self.per_mouse)
+            if self.per_mouse['exit'].max() == final:
+                touched = self.per_mouse[self.per_mouse['regimen'].isin(latest['regimen'])]
+                self.survival_curves = {**self.survival_curves, **exit_curves(touched, final=final)}
+            else:
+                self.survival_curves = exit_curves(self.per_mouse)
+        return True
+
+    @timed_phase('filter')
+    def regimen_weight_counts(self, drug):
+        return self.weight_counts.get(drug, np.zeros(len(self.bin_centers), dtype=np.int64))
+
+    @timed_phase('filter')
+    def regimen_mouse_weight_counts(self, drug):
+        return self.mouse_weight_counts.get(drug, np.zeros(len(self.bin_centers), dtype=np.int64))
+
+    @timed_phase('filter')
+    def regimen_timepoint_counts(self, drug):
+        return self.timepoint_counts.get(drug, pd.Series(dtype='int64'))
+
+    @timed_phase('filter')
+    def regimen_survival_curve(self, drug):
+        return self.survival_curves.get(drug)
+
+
+def load_study_index():
+    """Build the study index of the configured backend; returns it and its data version."""
+    if study_backend == 'duckdb':
+        index = DuckDBStudyIndex(metadata_path, results_path, weight_bin_width)
+        return index, index.version
+    # Load data (from a binary snapshot when the CSVs have not changed)
+    study_frames, version = cached_frames(
+        'mouse_study', [metadata_path, results_path], lambda: read_mouse_study(metadata_path, results_path)
+    )
+    return StudyIndex(study_frames['merged_df'], study_frames['mouse_data'], weight_bin_width), version
+
+
+study_index, study_version = load_study_index()
+
+# Figures depend only on the selection and the data, so they are cached per
+# (sorted selection, data version). Set MOUSE_FIGURE_CACHE_DIR to share the
+# cache between worker processes.
+figure_cache = FigureCache(
+    maxsize=int(os.environ.get('MOUSE_FIGURE_CACHE_SIZE', 256)),
+    ttl=float(os.environ['MOUSE_FIGURE_CACHE_TTL']) if 'MOUSE_FIGURE_CACHE_TTL' in os.environ else None,
+    directory=os.environ.get('MOUSE_FIGURE_CACHE_DIR'),
+    version=study_version
+)
 
 # Define app and external stylesheets
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
+server = app.server
+
+
+# Per-callback filter/build/serialize latency histograms, served on /metrics
+metrics = CallbackMetrics.from_env().init_app(app)
+
+
+# With MOUSE_LIVE_RELOAD=1, rows appended to the CSVs are applied as deltas
+# to the study index and open pages are refreshed through the data-version
+# store below
+live_reload = os.environ.get('MOUSE_LIVE_RELOAD', '0') == '1'
+live_reload_interval = float(os.environ.get('LIVE_RELOAD_INTERVAL', 2.0))
+
+
+def reload_study():
+    global study_index
+    study_index, _ = load_study_index()
+
+
+# The watchers are only set up when live reload is on
+live_reloader = None
+if live_reload:
+    live_reloader = LiveReloader(reload_study, figure_cache.set_version, live_reload_interval)
+    live_reloader.watch(metadata_path, lambda rows: study_index.append_metadata(rows), MOUSE_METADATA_DTYPES)
+    live_reloader.watch(results_path, lambda rows: study_index.append_results(rows), STUDY_RESULTS_DTYPES)
+    app.server.before_request(live_reloader.start)
+
+
+@app.server.route('/figure-cache')
+def figure_cache_stats():
+    return figure_cache.stats()
 
 # Design parameters
 colors = {
@@ -34,29 +218,59 @@ drug_colors = {
     'Zoniferol': '#8980D4'
 }
 
+
+def drug_color(drug):
+    # Regimens added by a live reload get a palette colour that is the same in every worker
+    palette = plotly.colors.qualitative.Plotly
+    return drug_colors.get(drug, palette[zlib.crc32(drug.encode()) % len(palette)])
+
+
+def regimen_options():
+    return [{'label': drug, 'value': drug} for drug in study_index.regimens]
+
+
+drug_groups = {
+    'lightweight': ['Ramicane', 'Capomulin'],
+    'heavyweight': ['Ceftamin', 'Infubinol', 'Ketapril', 'Naftisol', 'Propriva', 'Stelasyn', 'Zoniferol'],
+    'placebo': ['Placebo']
+}
+
+# Layout shared by every chart, sent once with the page (see figure_payload.shared_layout_graph);
+# callbacks only send their axes and barmode
+graph_layout = {
+    'autosize': False,
+    'paper_bgcolor': colors['light-grey'],
+    'plot_bgcolor': colors['light-grey'],
+    'margin': {'l': 40, 'b': 40, 't': 10, 'r': 10},
+    'legend': {'x': 0, 'y': 1},
+}
+
 # App layout
 app.layout = html.Div(style={'backgroundColor': colors['light-grey']}, children=[
     html.H1('Mouse Study Dashboard', style={'textAlign': 'center', 'border': f'3px solid {colors["dark-blue"]}' }),
+    dcc.Interval(id='data-refresh', interval=live_reload_interval * 1000, disabled=not live_reload),
+    dcc.Store(id='data-version', data=figure_cache.version),
+    dcc.Store(id='shared-layout', data=graph_layout),
 
     # Row 1: Weight Histogram and Distribution Chart
     html.Div(style={'display': 'flex'}, children=[
         html.Div(style={'border': f'1px solid {colors["dark-blue"]}', 'margin': '10px', 'width': '50%'}, children=[
             dcc.Checklist(
                 id='weight-histogram-checklist',
-                options=[{'label': drug, 'value': drug} for drug in np.unique(mouse_data['Drug Regimen'])],
+                options=regimen_options(),
                 value=['Placebo'],
                 labelStyle={'display': 'inline-block'}
             ),
-            dcc.Graph(id='weight-histogram')
+            *shared_layout_graph(app, 'weight-histogram')
         ]),
         html.Div(style={'border': f'1px solid {colors["dark-blue"]}', 'margin': '10px', 'width': '50%'}, children=[
             dcc.RadioItems(
                 id='overlay-drug-radio',
-                options=[{'label': drug, 'value': drug} for drug in np.unique(mouse_data['Drug Regimen'])],
+                options=regimen_options(),
                 value='Placebo',
                 labelStyle={'display': 'inline-block'}
             ),
-            dcc.Graph(id='weight-distribution-chart', figure={})
+            *shared_layout_graph(app, 'weight-distribution-chart', figure={})
         ])
     ]),
 
@@ -73,10 +287,10 @@ app.layout = html.Div(style={'backgroundColor': colors['light-grey']}, children=
                 value=['placebo'],
                 labelStyle={'display': 'inline-block'}
             ),
-            dcc.Graph(id='survival-function-chart', figure={})
+            *shared_layout_graph(app, 'survival-function-chart', figure={})
         ]),
         html.Div(style={'border': f'1px solid {colors["dark-blue"]}', 'margin': '10px', 'width': '50%'}, children=[
-            dcc.Graph(id='survival-function-time-chart', figure={}),
+            *shared_layout_graph(app, 'survival-function-time-chart', figure={}),
             dcc.Checklist(
                 id='drug-group-time-checklist',
                 options=[
@@ -86,25 +300,80 @@ app.layout = html.Div(style={'backgroundColor': colors['light-grey']}, children=
                 ],
                 value=['placebo'],
                 labelStyle={'display': 'inline-block'}
+            ),
+            dcc.RadioItems(
+                id='survival-time-mode',
+                options=[
+                    {'label': 'Mice alive', 'value': 'count'},
+                    {'label': 'Kaplan-Meier estimate', 'value': 'kaplan-meier'}
+                ],
+                value='count',
+                labelStyle={'display': 'inline-block'}
             )
         ])
     ])
 ])
 
 
+def weight_bars(counts, **style):
+    """Bar trace drawing pre-binned weight counts like a histogram."""
+    return go.Bar(x=study_index.bin_centers, y=counts, width=study_index.bin_width, **style)
+
+
+def kaplan_meier_traces(curve, name, color):
+    """Step line for a Kaplan-Meier curve plus a shaded confidence band."""
+    if curve is None:
+        return []
+    times = curve.index.to_numpy()
+    band = dict(x=times, mode='lines', line=dict(width=0, shape='hv', color=color),
+                showlegend=False, hoverinfo='skip', legendgroup=name)
+    return [
+        go.Scatter(y=curve['upper'].to_numpy(), **band),
+        go.Scatter(y=curve['lower'].to_numpy(), fill='tonexty', opacity=0.2, **band),
+        go.Scatter(x=times, y=curve['survival'].to_numpy(), mode='lines', name=name, legendgroup=name,
+                   line=dict(color=color, shape='hv'))
+    ]
+
+
 # Callbacks
 @app.callback(
-    Output('weight-histogram', 'figure'),
-    [Input('weight-histogram-checklist', 'value')]
+    Output('data-version', 'data'),
+    [Input('data-refresh', 'n_intervals')],
+    [State('data-version', 'data')]
+)
+@metrics.instrument
+def refresh_data_version(n_intervals, current_version):
+    # Every figure takes the data version as an input, so a new version redraws them all
+    return dash.no_update if figure_cache.version == current_version else figure_cache.version
+
+@app.callback(
+    [Output('weight-histogram-checklist', 'options'),
+     Output('overlay-drug-radio', 'options')],
+    [Input('data-version', 'data')],
+    prevent_initial_call=True
+)
+@metrics.instrument
+def update_regimen_options(version):
+    # A reload can add regimens that were not in the study at startup
+    options = regimen_options()
+    return options, options
+
+@app.callback(
+    Output(figure_store_id('weight-histogram'), 'data'),
+    [Input('weight-histogram-checklist', 'value'),
+     Input('data-version', 'data')]
 )
-def update_weight_histogram(drug_names):
+@metrics.instrument
+@figure_cache.memoize
+@minimized
+def update_weight_histogram(drug_names, version=None):
     traces = []
     for drug in drug_names:
-        traces.append(go.Histogram(
-            x=merged_df[merged_df['Drug Regimen'] == drug]['Weight (g)'],
+        traces.append(weight_bars(
+            study_index.regimen_weight_counts(drug),
             name=drug,
             opacity=0.9,
-            marker=dict(color=drug_colors[drug])
+            marker=dict(color=drug_color(drug))
         ))
     return {
         'data': traces,
@@ -112,33 +381,32 @@ def update_weight_histogram(drug_names):
             'barmode': 'stack',
             'xaxis': {'title': 'Mouse Weight', 'showgrid': False},
             'yaxis': {'title': 'Number of Mice', 'showgrid': False},
-            'autosize': False,
-            'paper_bgcolor': colors['light-grey'],
-            'plot_bgcolor': colors['light-grey'],
-            'margin': {'l': 40, 'b': 40, 't': 10, 'r': 10},
-            'legend': {'x': 0, 'y': 1},
         }
     }
 
 @app.callback(
-    Output('weight-distribution-chart', 'figure'),
-    [Input('overlay-drug-radio', 'value')]
+    Output(figure_store_id('weight-distribution-chart'), 'data'),
+    [Input('overlay-drug-radio', 'value'),
+     Input('data-version', 'data')]
 )
-def update_weight_distribution(selected_drug):
+@metrics.instrument
+@figure_cache.memoize
+@minimized
+def update_weight_distribution(selected_drug, version=None):
     traces = []
-    overall_distribution = go.Histogram(
-        x=mouse_data['Weight (g)'],
+    overall_distribution = weight_bars(
+        study_index.all_mouse_weight_counts,
         name='All mice',
         opacity=0.5,
         marker=dict(color='gray')
     )
     traces.append(overall_distribution)
     if selected_drug:
-        selected_distribution = go.Histogram(
-            x=mouse_data[mouse_data['Drug Regimen'] == selected_drug]['Weight (g)'],
+        selected_distribution = weight_bars(
+            study_index.regimen_mouse_weight_counts(selected_drug),
             name=selected_drug,
             opacity=0.9,
-            marker=dict(color=drug_colors[selected_drug])
+            marker=dict(color=drug_color(selected_drug))
         )
         traces.append(selected_distribution)
     return {
@@ -147,35 +415,28 @@ def update_weight_distribution(selected_drug):
             'barmode': 'overlay',
             'xaxis': {'title': 'Mouse Weight'},
             'yaxis': {'title': 'Number of Mice'},
-            'autosize': False,
-            'paper_bgcolor': colors['light-grey'],
-            'plot_bgcolor': colors['light-grey'],
-            'margin': {'l': 40, 'b': 40, 't': 10, 'r': 10},
-            'legend': {'x': 0, 'y': 1},
         }
     }
 
 @app.callback(
-    Output('survival-function-chart', 'figure'),
-    [Input('drug-group-checklist', 'value')]
+    Output(figure_store_id('survival-function-chart'), 'data'),
+    [Input('drug-group-checklist', 'value'),
+     Input('data-version', 'data')]
 )
-def update_survival_function(selected_group):
+@metrics.instrument
+@figure_cache.memoize
+@minimized
+def update_survival_function(selected_group, version=None):
     traces = []
     for drug in selected_group:
-        if drug == 'lightweight':
-            drugs_of_interest = ['Ramicane', 'Capomulin']
-        elif drug == 'heavyweight':
-            drugs_of_interest = ['Ceftamin', 'Infubinol', 'Ketapril', 'Naftisol', 'Propriva', 'Stelasyn', 'Zoniferol']
-        else:
-            drugs_of_interest = ['Placebo']
+        drugs_of_interest = drug_groups.get(drug, drug_groups['placebo'])
 
         for d in drugs_of_interest:
-            drug_data = merged_df[merged_df['Drug Regimen'] == d]
-            traces.append(go.Histogram(
-                x=drug_data['Weight (g)'],
+            traces.append(weight_bars(
+                study_index.regimen_weight_counts(d),
                 name=f'{d} - {drug}',
                 opacity=0.6,
-                marker=dict(color=drug_colors[d])
+                marker=dict(color=drug_color(d))
             ))
 
     return {
@@ -184,50 +445,44 @@ def update_survival_function(selected_group):
             'barmode': 'overlay',
             'xaxis': {'title': 'Mouse Weight (g)', 'showgrid': False},
             'yaxis': {'title': 'Number of Mice', 'showgrid': False},
-            'autosize': False,
-            'paper_bgcolor': colors['light-grey'],
-            'plot_bgcolor': colors['light-grey'],
-            'margin': {'l': 40, 'b': 40, 't': 10, 'r': 10},
-            'legend': {'x': 0, 'y': 1},
         }
     }
 
 @app.callback(
-    Output('survival-function-time-chart', 'figure'),
-    [Input('drug-group-time-checklist', 'value')]
+    Output(figure_store_id('survival-function-time-chart'), 'data'),
+    [Input('drug-group-time-checklist', 'value'),
+     Input('survival-time-mode', 'value'),
+     Input('data-version', 'data')]
 )
-def update_survival_function_time(selected_group):
+@metrics.instrument
+@figure_cache.memoize
+@minimized
+def update_survival_function_time(selected_group, mode='count', version=None):
     traces = []
     for drug in selected_group:
-        if drug == 'lightweight':
-            drugs_of_interest = ['Ramicane', 'Capomulin']
-        elif drug == 'heavyweight':
-            drugs_of_interest = ['Ceftamin', 'Infubinol', 'Ketapril', 'Naftisol', 'Propriva', 'Stelasyn', 'Zoniferol']
-        else:
-            drugs_of_interest = ['Placebo']
+        drugs_of_interest = drug_groups.get(drug, drug_groups['placebo'])
 
         for d in drugs_of_interest:
-            drug_data = merged_df[merged_df['Drug Regimen'] == d]
-            timepoints = sorted(drug_data['Timepoint'].unique())
-            mice_alive = [len(drug_data[drug_data['Timepoint'] == tp]) for tp in timepoints]
+            if mode == 'kaplan-meier':
+                traces.extend(kaplan_meier_traces(study_index.regimen_survival_curve(d), f'{d} - {drug}', drug_color(d)))
+                continue
+            counts = study_index.regimen_timepoint_counts(d)
             traces.append(go.Scatter(
-                x=timepoints,
-                y=mice_alive,
+                x=counts.index.to_numpy(),
+                y=counts.to_numpy(),
                 mode='lines',
                 name=f'{d} - {drug}',
-                line=dict(color=drug_colors[d])
+                line=dict(color=drug_color(d))
             ))
 
     return {
         'data': traces,
         'layout': {
             'xaxis': {'title': 'Time', 'showgrid': False},
-            'yaxis': {'title': 'Number of Mice Alive', 'showgrid': False},
-            'autosize': False,
-            'paper_bgcolor': colors['light-grey'],
-            'plot_bgcolor': colors['light-grey'],
-            'margin': {'l': 40, 'b': 40, 't': 10, 'r': 10},
-            'legend': {'x': 0, 'y': 1},
+            'yaxis': {
+                'title': 'Survival Probability' if mode == 'kaplan-meier' else 'Number of Mice Alive',
+                'showgrid': False
+            },
         }
     }
 
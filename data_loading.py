@@ -0,0 +1,242 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import warnings
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+SNAPSHOT_DIR = os.environ.get('DATA_SNAPSHOT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.snapshots'))
+
+# Bump when the cleaning code changes so old snapshots are rebuilt
+SNAPSHOT_FORMAT = 2
+
+MOUSE_METADATA_DTYPES = {
+    'Mouse ID': 'str',
+    'Drug Regimen': 'category',
+    'Sex': 'category',
+    'Age_months': 'int16',
+    'Weight (g)': 'float32',
+}
+
+STUDY_RESULTS_DTYPES = {
+    'Mouse ID': 'str',
+    'Timepoint': 'int16',
+    'Tumor Volume (mm3)': 'float64',
+    'Metastatic Sites': 'int8',
+}
+
+WORLD_NUMERICAL_COLUMNS = [
+    'Density\n(P/Km2)', 'Agricultural Land( %)', 'Land Area(Km2)', 'Armed Forces size', 'Birth Rate',
+    'Co2-Emissions', 'CPI', 'CPI Change (%)', 'Fertility Rate', 'Forested Area (%)', 'Gasoline Price',
+    'GDP', 'Gross primary education enrollment (%)', 'Gross tertiary education enrollment (%)',
+    'Infant mortality', 'Life expectancy', 'Maternal mortality ratio', 'Minimum wage',
+    'Out of pocket health expenditure', 'Physicians per thousand', 'Population',
+    'Population: Labor force participation (%)', 'Tax revenue (%)', 'Total tax rate',
+    'Unemployment rate', 'Urban_population'
+]
+
+# Numeric columns are read as text and parsed by clean_numeric_columns
+WORLD_DATA_DTYPES = {'Country': 'str', **{column: 'object' for column in WORLD_NUMERICAL_COLUMNS}}
+
+# Thousands separators, percent and dollar signs, and stray whitespace
+NUMBER_FORMATTING = r'[,%$\s]'
+NUMBER_PATTERN = r'^[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?$'
+
+
+def configured_path(option, env_var, default):
+    """Data file path from ``--option`` on the command line, then ``env_var``, then ``default``."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument(f'--{option}')
+    args, _ = parser.parse_known_args()
+    return getattr(args, option.replace('-', '_')) or os.environ.get(env_var) or default
+
+
+def read_mouse_study(metadata_path, results_path):
+    """Read both mouse study CSVs with explicit dtypes and merge them on ``Mouse ID``."""
+    mouse_data = pd.read_csv(metadata_path, dtype=MOUSE_METADATA_DTYPES)
+    study_results = pd.read_csv(results_path, dtype=STUDY_RESULTS_DTYPES)
+    merged_df = pd.merge(mouse_data, study_results, on='Mouse ID')
+    merged_df['Mouse ID'] = merged_df['Mouse ID'].astype('category')
+    return {'mouse_data': mouse_data, 'merged_df': merged_df}
+
+
+def parse_number_text(cells):
+    """Parse an object array of formatted numbers (``'1,234'``, ``'5%'``, ``'$3.20 '``) to floats.
+
+    Returns the floats, with NaN for missing or unparseable cells, and a mask of
+    the non-empty cells that did not parse. Uses Arrow compute kernels when
+    pyarrow is installed and pandas string methods otherwise.
+    """
+    if HAVE_PYARROW:
+        try:
+            text = pa.array(cells, type=pa.string(), from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Not all strings (e.g. some cells already numeric); use the pandas path
+            text = None
+        if text is not None:
+            for symbol in ',%$':
+                text = pc.replace_substring(text, symbol, '')
+            text = pc.utf8_trim_whitespace(text)
+            valid = pc.match_substring_regex(text, NUMBER_PATTERN)
+            parsed = pc.cast(pc.if_else(valid, text, None), pa.float64())
+            failed = pc.invert(pc.or_kleene(valid, pc.equal(text, ''))).fill_null(False)
+            return parsed.to_numpy(zero_copy_only=False), failed.to_numpy(zero_copy_only=False)
+
+    cells = pd.Series(cells, dtype=object)
+    cells = cells.where(cells.isna(), cells.astype(str))
+    stripped = cells.str.replace(NUMBER_FORMATTING, '', regex=True)
+    parsed = pd.to_numeric(stripped, errors='coerce').to_numpy(dtype=float)
+    failed = np.isnan(parsed) & stripped.fillna('').ne('').to_numpy()
+    return parsed, failed
+
+
+def clean_numeric_columns(frame, columns, fill=None):
+    """Parse ``columns`` to floats in one vectorized pass and fill gaps with column means.
+
+    Every cell of the non-numeric columns is stripped and parsed in one pass
+    over a single flattened array, and the means are imputed for all columns
+    at once.
+    ``fill`` replaces the means (e.g. the means of the rows already loaded).
+    Returns the cleaned frame and, per column, how many non-empty cells could
+    not be parsed (those are imputed like missing values).
+    """
+    text_columns = [column for column in columns if not pd.api.types.is_numeric_dtype(frame[column])]
+    numeric = frame[columns].astype({column: float for column in columns if column not in text_columns})
+    failures = pd.Series(0, index=columns)
+    if text_columns:
+        parsed, failed = parse_number_text(frame[text_columns].to_numpy(dtype=object).ravel(order='F'))
+        shape = (len(text_columns), len(frame))
+        numeric = numeric.assign(**pd.DataFrame(parsed.reshape(shape).T, index=frame.index, columns=text_columns))
+        failures[text_columns] = failed.reshape(shape).sum(axis=1)
+    numeric = numeric.fillna(numeric.mean() if fill is None else fill)
+    return frame.assign(**numeric), failures
+
+
+def read_world_data(path):
+    """Read and clean the world data CSV; numeric columns are read as text and parsed here."""
+    return {'data': clean_world_data(pd.read_csv(path, dtype=WORLD_DATA_DTYPES))}
+
+
+def clean_world_data(data, fill=None):
+    """Clean raw world data rows; ``fill`` is passed on to ``clean_numeric_columns``."""
+    # Clean country names
+    data["Country"] = data["Country"].str.replace("S�����������", "")
+    data["Country"] = data["Country"].replace("", np.nan)
+    data = data.dropna(subset=['Country'])
+
+    # Clean and convert numerical variables, filling missing values with the column mean
+    data, failures = clean_numeric_columns(data, WORLD_NUMERICAL_COLUMNS, fill)
+    if failures.any():
+        warnings.warn(f'Unparseable values treated as missing: {failures[failures > 0].to_dict()}')
+
+    # Create a new column for GDP per capita
+    data['GDP per capita'] = data['GDP'] / data['Population']
+    return data
+
+
+def source_fingerprint(paths, verify='mtime'):
+    """Identify the current contents of ``paths`` by size and mtime, or by content hash."""
+    fingerprint = {'format': SNAPSHOT_FORMAT}
+    for path in paths:
+        stat = os.stat(path)
+        if verify == 'hash':
+            digest = hashlib.sha1()
+            with open(path, 'rb') as file:
+                for block in iter(lambda: file.read(1 << 20), b''):
+                    digest.update(block)
+            fingerprint[os.path.abspath(path)] = digest.hexdigest()
+        else:
+            fingerprint[os.path.abspath(path)] = [stat.st_size, stat.st_mtime_ns]
+    return fingerprint
+
+
+def fingerprint_version(fingerprint):
+    """Short version string of a ``source_fingerprint``."""
+    return hashlib.sha1(json.dumps(fingerprint, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def snapshot_file(snapshot_dir, name, key, mmap=False):
+    extension = ('arrow' if mmap else 'parquet') if HAVE_PYARROW else 'pkl'
+    return os.path.join(snapshot_dir, f'{name}.{key}.{extension}')
+
+
+def write_frame(frame, path):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    if path.endswith('.arrow'):
+        # Uncompressed Arrow IPC, so readers can map the columns without decoding them
+        table = pa.Table.from_pandas(frame)
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    elif HAVE_PYARROW:
+        frame.to_parquet(tmp_path)
+    else:
+        frame.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def read_frame(path):
+    if path.endswith('.arrow'):
+        # Numeric columns without nulls stay zero-copy, read-only views of the
+        # mapped file, and strings stay Arrow-backed, so every process reading
+        # the snapshot shares the same page-cache pages
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        return table.to_pandas(split_blocks=True)
+    return pd.read_parquet(path) if HAVE_PYARROW else pd.read_pickle(path)
+
+
+def cached_frames(name, sources, build, snapshot_dir=None, verify=None, mmap=None):
+    """Return ``build()``'s dict of cleaned frames, reusing a binary snapshot when possible.
+
+    The snapshot is kept under ``snapshot_dir`` as one Parquet file per frame
+    (pickle without pyarrow) plus a JSON fingerprint of ``sources``. It is
+    rebuilt when any source's size/mtime changes (or its content hash, with
+    ``verify='hash'`` or ``DATA_SNAPSHOT_VERIFY=hash``). Returns the frames
+    and a short version string that changes whenever the data does.
+
+    With ``mmap=True`` (or ``DATA_SNAPSHOT_MMAP=1``) the snapshot is stored as
+    Arrow IPC files and the frames are memory-mapped from them, so worker
+    processes serving the same data share one copy of it.
+    """
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    verify = verify or os.environ.get('DATA_SNAPSHOT_VERIFY', 'mtime')
+    if mmap is None:
+        mmap = os.environ.get('DATA_SNAPSHOT_MMAP', '0') == '1'
+    fingerprint = source_fingerprint(sources, verify)
+    version = fingerprint_version(fingerprint)
+    meta_path = os.path.join(snapshot_dir, f'{name}.json')
+
+    try:
+        with open(meta_path) as file:
+            meta = json.load(file)
+        if meta['fingerprint'] == fingerprint and meta.get('mmap', False) == mmap:
+            frames = {key: read_frame(snapshot_file(snapshot_dir, name, key, mmap)) for key in meta['frames']}
+            return frames, version
+    except (OSError, ValueError, KeyError, pickle.UnpicklingError):
+        pass
+
+    frames = build()
+    try:
+        os.makedirs(snapshot_dir, exist_ok=True)
+        for key, frame in frames.items():
+            write_frame(frame, snapshot_file(snapshot_dir, name, key, mmap))
+        tmp_path = f'{meta_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump({'fingerprint': fingerprint, 'frames': list(frames), 'mmap': mmap}, file)
+        # The fingerprint is written last so a half-written snapshot is never trusted
+        os.replace(tmp_path, meta_path)
+        if mmap:
+            # Serve from the mapped files too, and drop the private copies just built
+            frames = {key: read_frame(snapshot_file(snapshot_dir, name, key, mmap)) for key in frames}
+    except OSError:
+        pass
+    return frames, version
@@ -0,0 +1,140 @@
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize(value):
+    """Make callback arguments hashable and order-independent (lists become sorted tuples)."""
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(value, key=str))
+    return value
+
+
+class FigureCache:
+    """LRU cache of callback figures keyed by the normalized selection and a data version.
+
+    Entries live in an in-process ``OrderedDict``. If ``directory`` is given they
+    are also pickled there, so every Dash worker process on the machine shares
+    them. ``maxsize`` bounds both tiers (the disk tier drops the oldest files
+    first) and ``ttl`` (seconds) expires entries.
+    """
+
+    def __init__(self, maxsize=256, ttl=None, directory=None, version=''):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.directory = directory
+        self.version = version
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def stats(self):
+        return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                'size': len(self.entries)}
+
+    def set_version(self, version):
+        """Switch to a new data version; entries of older versions are never served again."""
+        with self.lock:
+            self.version = version
+            self.entries.clear()
+
+    def make_key(self, name, args):
+        raw = repr((name, self.version, tuple(normalize(arg) for arg in args)))
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and not self.expired(entry[0], now):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.entries.pop(key, None)
+        found, value = self.read_disk(key, now)
+        with self.lock:
+            if found:
+                self.disk_hits += 1
+                self.store_memory(key, value, now)
+            else:
+                self.misses += 1
+        return found, value
+
+    def put(self, key, value):
+        now = time.time()
+        with self.lock:
+            self.store_memory(key, value, now)
+        self.write_disk(key, value)
+
+    def expired(self, created, now):
+        return self.ttl is not None and now - created > self.ttl
+
+    def store_memory(self, key, value, created):
+        self.entries[key] = (created, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def disk_path(self, key):
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    def read_disk(self, key, now):
+        if self.directory is None:
+            return False, None
+        path = self.disk_path(key)
+        try:
+            if self.expired(os.path.getmtime(path), now):
+                os.remove(path)
+                return False, None
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False, None
+        return True, value
+
+    def write_disk(self, key, value):
+        if self.directory is None:
+            return
+        # Write to a temporary file and rename so other workers never read half an entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.disk_path(key))
+        self.evict_disk()
+
+    def evict_disk(self):
+        try:
+            paths = [entry.path for entry in os.scandir(self.directory) if entry.name.endswith('.pkl')]
+            if len(paths) <= self.maxsize:
+                return
+            paths.sort(key=os.path.getmtime)
+            for path in paths[:len(paths) - self.maxsize]:
+                os.remove(path)
+        except OSError:
+            # Another worker evicted the same files first
+            pass
+
+    def memoize(self, func):
+        """Cache ``func``'s result per normalized arguments; ``func`` sees the normalized arguments too."""
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            args = tuple(list(arg) if isinstance(arg, tuple) else arg for arg in map(normalize, args))
+            key = self.make_key(func.__qualname__, args)
+            found, value = self.get(key)
+            if not found:
+                value = func(*args)
+                self.put(key, value)
+            return value
+
+        wrapper.cache = self
+        return wrapper
@@ -0,0 +1,157 @@
+import base64
+import functools
+
+import numpy as np
+from dash import Input, Output, State, dcc
+
+# numpy dtypes plotly.js can decode from a base64 typed-array spec
+TYPED_ARRAY_CODES = {
+    np.dtype('float64'): 'f8', np.dtype('float32'): 'f4',
+    np.dtype('int32'): 'i4', np.dtype('int16'): 'i2', np.dtype('int8'): 'i1',
+    np.dtype('uint32'): 'u4', np.dtype('uint16'): 'u2', np.dtype('uint8'): 'u1',
+}
+
+# Trace attributes that may hold long per-point numeric arrays
+ARRAY_ATTRIBUTES = ('x', 'y', 'z', 'values', 'lat', 'lon')
+MARKER_ARRAY_ATTRIBUTES = ('size', 'color', 'opacity')
+
+# Browser side of shared_layout_graph: the figure from the store plus the shared layout entries
+MERGE_SHARED_LAYOUT = """
+function(figure, sharedLayout) {
+    if (!figure) {
+        return window.dash_clientside.no_update;
+    }
+    return Object.assign({}, figure, {layout: Object.assign({}, sharedLayout, figure.layout)});
+}
+"""
+
+
+def smallest_dtype(values):
+    """Narrowest plotly.js typed-array dtype that holds ``values`` exactly."""
+    if values.dtype.kind == 'f':
+        finite = values[np.isfinite(values)]
+        if len(finite) == len(values) and len(values) and np.array_equal(finite, np.round(finite)):
+            values = values.astype(np.int64)
+        elif np.array_equal(values.astype(np.float32), values, equal_nan=True):
+            return np.dtype('float32')
+        else:
+            return np.dtype('float64')
+    low, high = values.min(), values.max()
+    for dtype in ('uint8', 'int8', 'uint16', 'int16', 'uint32', 'int32'):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return np.dtype(dtype)
+    # plotly.js has no 64-bit integer arrays
+    return np.dtype('float64')
+
+
+def typed_array(values, min_length=8):
+    """Base64 typed-array spec (``{'dtype', 'bdata'}``) for a numeric array, or None if plain JSON is smaller."""
+    if isinstance(values, (list, tuple)):
+        if not values or not all(isinstance(value, (int, float)) and not isinstance(value, bool)
+                                 for value in values):
+            return None
+        values = np.asarray(values)
+    if not isinstance(values, np.ndarray) or values.ndim != 1 or len(values) < min_length \
+            or values.dtype.kind not in 'iuf':
+        return None
+    dtype = smallest_dtype(values)
+    # base64 payload plus the {"dtype": .., "bdata": ..} wrapper
+    encoded_length = -(-len(values) * dtype.itemsize // 3) * 4 + 28
+    sample = values[:64]
+    json_length = len(','.join(map(repr, sample.tolist()))) / len(sample) * len(values)
+    if encoded_length >= json_length:
+        return None
+    data = np.ascontiguousarray(values.astype(dtype, copy=False)).tobytes()
+    return {'dtype': TYPED_ARRAY_CODES[dtype], 'bdata': base64.b64encode(data).decode('ascii')}
+
+
+def encode_trace_arrays(trace):
+    for attribute in ARRAY_ATTRIBUTES:
+        encoded = typed_array(trace.get(attribute))
+        if encoded is not None:
+            trace[attribute] = encoded
+    marker = trace.get('marker')
+    if isinstance(marker, dict):
+        for attribute in MARKER_ARRAY_ATTRIBUTES:
+            encoded = typed_array(marker.get(attribute))
+            if encoded is not None:
+                marker[attribute] = encoded
+
+
+def strip_unused_hover_data(trace):
+    """Drop per-point hover arrays the trace's hover template never shows."""
+    template = trace.get('hovertemplate')
+    if template is None:
+        return
+    hovertext = trace.get('hovertext')
+    name = trace.get('name')
+    if hovertext is not None and name is not None and len(hovertext) and all(text == name for text in hovertext):
+        # One trace per country (color="Country"): the hover name is the trace name
+        trace.pop('hovertext')
+        trace['hovertemplate'] = template = template.replace('%{hovertext}', '%{fullData.name}')
+    if 'customdata' in trace and 'customdata' not in template:
+        trace.pop('customdata')
+    if 'text' in trace and '%{text}' not in template and 'text' not in str(trace.get('mode', '')):
+        trace.pop('text')
+
+
+def minimize_figure(figure, shared_layout=None):
+    """Smaller JSON for a figure: typed arrays, no unused hover data, template trimmed to the traces used.
+
+    Layout entries equal to those of ``shared_layout`` are dropped, for graphs
+    that get them in the browser from ``shared_layout_graph``.
+    """
+    figure = figure.to_plotly_json() if hasattr(figure, 'to_plotly_json') else dict(figure)
+    data = [dict(trace) if isinstance(trace, dict) else trace.to_plotly_json() for trace in figure.get('data', [])]
+    for trace in data:
+        strip_unused_hover_data(trace)
+        encode_trace_arrays(trace)
+    figure['data'] = data
+
+    layout = figure.get('layout')
+    if isinstance(layout, dict) and shared_layout:
+        layout = figure['layout'] = {
+            key: value for key, value in layout.items() if key not in shared_layout or shared_layout[key] != value
+        }
+    template = layout.get('template') if isinstance(layout, dict) else None
+    if isinstance(template, dict) and 'data' in template:
+        used = {trace.get('type', 'scatter') for trace in data}
+        layout = figure['layout'] = dict(layout)
+        layout['template'] = dict(template, data={
+            trace_type: defaults for trace_type, defaults in template['data'].items() if trace_type in used
+        })
+    return figure
+
+
+def minimized(builder=None, shared_layout=None):
+    """Decorator returning ``builder``'s figure passed through ``minimize_figure``."""
+    if builder is None:
+        return functools.partial(minimized, shared_layout=shared_layout)
+
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        return minimize_figure(builder(*args, **kwargs), shared_layout)
+
+    return wrapper
+
+
+def figure_store_id(graph_id):
+    return f'{graph_id}-figure'
+
+
+def shared_layout_graph(app, graph_id, shared_layout_id='shared-layout', **graph_props):
+    """A ``dcc.Graph`` whose figure is assembled in the browser, and the store it is assembled from.
+
+    Callbacks send the figure without the shared layout entries to
+    ``Output(figure_store_id(graph_id), 'data')``; a clientside callback adds
+    the entries from the ``shared_layout_id`` store, which the page layout
+    carries once for every graph. Returns ``[store, graph]`` for the layout.
+    """
+    app.clientside_callback(
+        MERGE_SHARED_LAYOUT,
+        Output(graph_id, 'figure'),
+        Input(figure_store_id(graph_id), 'data'),
+        State(shared_layout_id, 'data')
+    )
+    return [dcc.Store(id=figure_store_id(graph_id)), dcc.Graph(id=graph_id, **graph_props)]
@@ -0,0 +1,24 @@
+"""gunicorn settings for the dashboards.
+
+The app is imported once in the master (``preload_app``) and the workers are
+forked from it, so the data is loaded and cleaned once, not once per worker.
+The cleaned frames are memory-mapped from Arrow snapshot files
+(``DATA_SNAPSHOT_MMAP``), so their buffers are read-only page-cache pages that
+every worker shares rather than copy-on-write heap pages that Python's
+reference counting slowly un-shares.
+
+    gunicorn -c gunicorn.conf.py                          # mouse study dashboard
+    DASH_WSGI_APP='wsgi:world_server()' gunicorn -c gunicorn.conf.py
+"""
+import os
+
+os.environ.setdefault('DATA_SNAPSHOT_MMAP', '1')
+
+wsgi_app = os.environ.get('DASH_WSGI_APP', 'wsgi:mouse_server()')
+bind = os.environ.get('DASH_BIND', '127.0.0.1:8050')
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+preload_app = os.environ.get('DASH_PRELOAD', '1') == '1'
+
+
+def post_worker_init(worker):
+    worker.log.info('Worker ready (pid: %s)', worker.pid)
@@ -0,0 +1,144 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Continuous scale the single WebGL trace maps country codes onto
+CATEGORY_COLORSCALE = 'Turbo'
+
+
+def zoom_view(relayout_data):
+    """The axis ranges of a ``relayoutData`` event as ``{'x': [low, high] or None, 'y': ...}``.
+
+    Returns None for events that change no axis (resizing, drag mode); an
+    autorange reset gives ``{'x': None, 'y': None}``. Ranges are rounded to six
+    significant digits so nearby zooms share cached figures.
+    """
+    if not relayout_data:
+        return None
+    view = {}
+    for axis in ('x', 'y'):
+        prefix = f'{axis}axis.'
+        if f'{prefix}range[0]' in relayout_data and f'{prefix}range[1]' in relayout_data:
+            low, high = relayout_data[f'{prefix}range[0]'], relayout_data[f'{prefix}range[1]']
+        elif f'{prefix}range' in relayout_data:
+            low, high = relayout_data[f'{prefix}range']
+        elif relayout_data.get(f'{prefix}autorange'):
+            view[axis] = None
+            continue
+        else:
+            continue
+        view[axis] = [float(f'{min(low, high):.6g}'), float(f'{max(low, high):.6g}')]
+    if not view:
+        return None
+    return {'x': view.get('x'), 'y': view.get('y')}
+
+
+def category_codes(values):
+    """Integer codes of ``values`` in sorted order, to colour one trace by category."""
+    return pd.Categorical(values).codes
+
+
+def axis_range(values, limit=None):
+    if limit is not None:
+        return limit
+    if not len(values):
+        return [0.0, 1.0]
+    low, high = float(values.min()), float(values.max())
+    # A single distinct value still needs a bin of non-zero width
+    return [low, high] if high > low else [low - 0.5, high + 0.5]
+
+
+def density_heatmap(frame, x, y, bins=200, view=None, title=None, labels=None):
+    """Server-side 2D histogram of ``frame[x]`` against ``frame[y]`` as a ``go.Heatmap``.
+
+    Only ``bins`` x ``bins`` counts reach the browser, whatever the number of
+    rows. With a ``view`` from ``zoom_view`` the bins cover just the zoomed
+    ranges; an axis left out of the view spans the rows inside the other one.
+    """
+    labels = labels or {}
+    view = view or {'x': None, 'y': None}
+    xs, ys = frame[x].to_numpy(dtype=float), frame[y].to_numpy(dtype=float)
+    inside = np.isfinite(xs) & np.isfinite(ys)
+    for values, limit in ((xs, view['x']), (ys, view['y'])):
+        if limit is not None:
+            inside &= (values >= limit[0]) & (values <= limit[1])
+    xs, ys = xs[inside], ys[inside]
+    x_range, y_range = axis_range(xs, view['x']), axis_range(ys, view['y'])
+    counts, x_edges, y_edges = np.histogram2d(xs, ys, bins=bins, range=[x_range, y_range])
+    # Empty bins are left transparent; float32 holds counts below 2**24 exactly at half the payload
+    z = np.where(counts > 0, counts, np.nan).T
+    if counts.max(initial=0) < 2 ** 24:
+        z = z.astype(np.float32)
+    fig = go.Figure(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2, z=z,
+        colorscale='Viridis', colorbar={'title': 'Rows'}, hoverongaps=False,
+        hovertemplate=f'{labels.get(x, x)}=%{{x}}<br>{labels.get(y, y)}=%{{y}}<br>rows=%{{z}}<extra></extra>'
+    ))
+    fig.update_layout(title=title, xaxis_title=labels.get(x, x), yaxis_title=labels.get(y, y))
+    fig.update_xaxes(range=x_range)
+    fig.update_yaxes(range=y_range)
+    return fig
+
+
+def scatter(frame, x, y, webgl_points, density_points, bins=200, view=None, **kwargs):
+    """``px.scatter`` that stays bounded in the browser as ``frame`` grows.
+
+    Up to ``webgl_points`` rows it is the plain SVG figure. Above that it uses
+    WebGL and draws one trace coloured by category codes instead of one trace
+    per ``color`` value; point labels (``text``) move to the hover. Above
+    ``density_points`` rows the points are replaced by ``density_heatmap``
+    over the current ``view``.
+    """
+    if len(frame) > density_points:
+        return density_heatmap(frame, x, y, bins, view, kwargs.get('title'), kwargs.get('labels'))
+    if len(frame) <= webgl_points:
+        return px.scatter(frame, x=x, y=y, **kwargs)
+    color = kwargs.pop('color', None)
+    text = kwargs.pop('text', None)
+    if text is not None:
+        kwargs.setdefault('hover_name', text)
+    fig = px.scatter(frame, x=x, y=y, render_mode='webgl', **kwargs)
+    if color is not None:
+        fig.update_traces(marker={'color': category_codes(frame[color]), 'colorscale': CATEGORY_COLORSCALE})
+    return fig
+
+
+def voxel_scatter(frame, x, y, z, bins=40, title=None, labels=None):
+    """One marker per occupied cell of a ``bins``^3 grid, coloured and sized by its row count."""
+    labels = labels or {}
+    values = frame[[x, y, z]].to_numpy(dtype=float)
+    values = values[np.isfinite(values).all(axis=1)]
+    ranges = [axis_range(column) for column in values.T]
+    counts, edges = np.histogramdd(values, bins=bins, range=ranges)
+    cells = np.nonzero(counts)
+    centers = [(axis_edges[:-1] + axis_edges[1:])[cell] / 2 for axis_edges, cell in zip(edges, cells)]
+    occupied = counts[cells]
+    fig = go.Figure(go.Scatter3d(
+        x=centers[0], y=centers[1], z=centers[2], mode='markers',
+        marker={'color': occupied, 'colorscale': 'Viridis', 'colorbar': {'title': 'Rows'},
+                'size': 3 + 9 * np.sqrt(occupied / occupied.max()) if len(occupied) else 3},
+        hovertemplate=(f'{labels.get(x, x)}≈%{{x}}<br>{labels.get(y, y)}≈%{{y}}<br>{labels.get(z, z)}≈%{{z}}'
+                       '<br>rows=%{marker.color}<extra></extra>')
+    ))
+    fig.update_layout(title=title, scene={'xaxis_title': labels.get(x, x), 'yaxis_title': labels.get(y, y),
+                                          'zaxis_title': labels.get(z, z)})
+    return fig
+
+
+def scatter_3d(frame, x, y, z, single_trace_points, density_points, bins=40, **kwargs):
+    """``px.scatter_3d`` (always WebGL) with the same thresholds as ``scatter``.
+
+    Above ``single_trace_points`` rows the per-``color`` traces become one
+    trace coloured by category codes; above ``density_points`` rows the points
+    are aggregated by ``voxel_scatter``.
+    """
+    if len(frame) > density_points:
+        return voxel_scatter(frame, x, y, z, bins, kwargs.get('title'), kwargs.get('labels'))
+    if len(frame) <= single_trace_points:
+        return px.scatter_3d(frame, x=x, y=y, z=z, **kwargs)
+    color = kwargs.pop('color', None)
+    fig = px.scatter_3d(frame, x=x, y=y, z=z, **kwargs)
+    if color is not None:
+        fig.update_traces(marker={'color': category_codes(frame[color]), 'colorscale': CATEGORY_COLORSCALE})
+    return fig
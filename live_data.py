@@ -0,0 +1,127 @@
+import io
+import os
+import threading
+import time
+import traceback
+
+import pandas as pd
+
+from data_loading import fingerprint_version, source_fingerprint
+
+
+class AppendWatcher:
+    """Reads the rows appended to a CSV file since the last poll.
+
+    Only complete records are consumed (quoted fields may span lines), so a
+    row the writer is still appending is picked up by the next poll. A file that shrinks or is replaced (new
+    inode) cannot be read as a delta and is reported as a reset.
+    """
+
+    def __init__(self, path, dtype=None):
+        self.path = path
+        self.dtype = dtype
+        stat = os.stat(path)
+        self.inode = stat.st_ino
+        self.offset = stat.st_size
+        with open(path, 'rb') as file:
+            self.header = file.readline()
+            while self.header.count(b'"') % 2:
+                self.header += file.readline()
+
+    def poll(self):
+        """Return ``(rows, reset)``: a DataFrame of new rows (or None), and whether the file was rewritten."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None, False
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            return None, True
+        if stat.st_size == self.offset:
+            return None, False
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            chunk = file.read(stat.st_size - self.offset)
+        end = chunk.rfind(b'\n') + 1
+        while end and chunk[:end].count(b'"') % 2:
+            end = chunk.rfind(b'\n', 0, end - 1) + 1
+        if not end:
+            return None, False
+        self.offset += end
+        if not chunk[:end].strip():
+            return None, False
+        return pd.read_csv(io.BytesIO(self.header + chunk[:end]), dtype=self.dtype), False
+
+    def changed(self):
+        """Whether the file was appended to or rewritten since the last poll."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return stat.st_ino != self.inode or stat.st_size != self.offset
+
+
+class LiveReloader:
+    """Polls data files on a background thread and folds appended rows into the app's aggregates.
+
+    ``watch(path, apply, dtype)`` registers a CSV; ``apply(rows)`` updates the
+    aggregates in place and returns False when the rows cannot be applied as a
+    delta. Then, or when a file is rewritten, ``reload()`` rebuilds everything
+    from scratch (again on the next check if a file grew during the reload).
+    After any change ``on_version`` receives the new data version (the hash
+    ``cached_frames`` would give the files), which invalidates the cached
+    figures. The thread is started on first use in each process, so it
+    also runs in workers forked from a preloading master.
+    """
+
+    def __init__(self, reload, on_version, interval=2.0):
+        self.reload = reload
+        self.on_version = on_version
+        self.interval = interval
+        self.sources = []
+        self.lock = threading.Lock()
+        self.pid = None
+        self.reload_pending = False
+
+    def watch(self, path, apply, dtype=None):
+        self.sources.append((path, apply, dtype, AppendWatcher(path, dtype)))
+
+    def start(self):
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+        threading.Thread(target=self.run, name='live-reloader', daemon=True).start()
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.check()
+            except Exception:
+                # Keep serving the last good data; the next poll retries
+                traceback.print_exc()
+
+    def check(self):
+        """Apply whatever was appended since the last check; returns True if the data changed."""
+        changed, full_reload = False, self.reload_pending
+        for path, apply, dtype, watcher in self.sources:
+            rows, reset = watcher.poll()
+            if reset:
+                full_reload = True
+            elif rows is not None:
+                changed = True
+                if not full_reload and not apply(rows):
+                    full_reload = True
+        if full_reload:
+            # The offsets are taken before reloading. Rows appended while reload() reads the
+            # files may or may not be in the new aggregates, so such a file is reloaded again
+            watchers = [AppendWatcher(path, dtype) for path, _, dtype, _ in self.sources]
+            self.reload()
+            self.sources = [(path, apply, dtype, watcher)
+                            for (path, apply, dtype, _), watcher in zip(self.sources, watchers)]
+            self.reload_pending = any(watcher.changed() for watcher in watchers)
+        if changed or full_reload:
+            paths = [path for path, _, _, _ in self.sources]
+            verify = os.environ.get('DATA_SNAPSHOT_VERIFY', 'mtime')
+            self.on_version(fingerprint_version(source_fingerprint(paths, verify)))
+        return changed or full_reload
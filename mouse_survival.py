@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+
+def mice_at_risk(study_df, regimen_col='Drug Regimen', time_col='Timepoint'):
+    """Number of mice measured at each timepoint, for every regimen in one groupby pass.
+
+    Returns a dict of regimen -> Series indexed by timepoint (sorted).
+    """
+    counts = study_df.groupby([regimen_col, time_col], observed=True, sort=True).size()
+    return {drug: series.droplevel(0) for drug, series in counts.groupby(level=0, observed=True)}
+
+
+def mouse_exits(study_df, mouse_col='Mouse ID', regimen_col='Drug Regimen', time_col='Timepoint'):
+    """Each mouse's regimen and last measured timepoint (``regimen`` and ``exit``), indexed by mouse."""
+    return study_df.groupby(mouse_col, observed=True).agg(regimen=(regimen_col, 'first'), exit=(time_col, 'max'))
+
+
+def exit_curves(per_mouse, confidence=0.95, final=None, time_col='Timepoint'):
+    """Kaplan-Meier curves per regimen from ``mouse_exits``; ``final`` defaults to the latest exit.
+
+    A mouse's last measured timepoint is taken as its time of death, unless it
+    was measured at ``final``, in which case it is censored there. Returns a
+    dict of regimen -> ``survival_curve`` DataFrame.
+    """
+    final = per_mouse['exit'].max() if final is None else final
+    event = per_mouse['exit'] < final
+    exits = event.groupby([per_mouse['regimen'], per_mouse['exit']], observed=True, sort=True).agg(['size', 'sum'])
+    return {
+        drug: survival_curve(table.droplevel(0), confidence, time_col)
+        for drug, table in exits.groupby(level=0, observed=True)
+    }
+
+
+def survival_curve(exits, confidence=0.95, time_col='Timepoint'):
+    """Kaplan-Meier curve of one regimen from its exit table.
+
+    ``exits`` is indexed by exit timepoint (sorted) with ``size`` (mice whose
+    last measurement was there) and ``sum`` (how many of them died there).
+    """
+    z = norm.ppf(0.5 + confidence / 2)
+    removed = exits['size'].to_numpy()
+    deaths = exits['sum'].to_numpy()
+    at_risk = removed[::-1].cumsum()[::-1]
+    survival = np.cumprod(1 - deaths / at_risk)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        greenwood = np.cumsum(deaths / (at_risk * (at_risk - deaths)))
+        spread = z * np.sqrt(greenwood) / np.abs(np.log(survival))
+        lower = survival ** np.exp(spread)
+        upper = survival ** np.exp(-spread)
+    # No deaths yet: the curve and its band are exactly 1
+    lower = np.where(survival == 1, 1.0, lower)
+    upper = np.where(survival == 1, 1.0, upper)
+    return pd.DataFrame({
+        'at_risk': at_risk,
+        'deaths': deaths,
+        'survival': survival,
+        'lower': lower,
+        'upper': upper,
+    }, index=exits.index.rename(time_col))
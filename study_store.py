@@ -0,0 +1,152 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from callback_metrics import timed_phase
+from data_loading import SNAPSHOT_DIR, fingerprint_version, source_fingerprint
+from mouse_survival import survival_curve
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# Column types of the Parquet copies, as data_loading reads the CSVs
+MOUSE_METADATA_TYPES = {
+    'Mouse ID': 'VARCHAR',
+    'Drug Regimen': 'VARCHAR',
+    'Sex': 'VARCHAR',
+    'Age_months': 'SMALLINT',
+    'Weight (g)': 'FLOAT',
+}
+
+STUDY_RESULTS_TYPES = {
+    'Mouse ID': 'VARCHAR',
+    'Timepoint': 'SMALLINT',
+    'Tumor Volume (mm3)': 'DOUBLE',
+    'Metastatic Sites': 'TINYINT',
+}
+
+
+def weight_bins(low, high, bin_width):
+    """Start, edges and centres of ``bin_width`` wide bins covering ``[low, high]``."""
+    bin_start = np.floor(low / bin_width) * bin_width
+    n_bins = int((high - bin_start) // bin_width) + 1
+    bin_edges = bin_start + bin_width * np.arange(n_bins + 1)
+    return bin_start, bin_edges, bin_edges[:-1] + bin_width / 2
+
+
+def sql_string(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def sql_types(types):
+    return '{' + ', '.join(f'{sql_string(column)}: {sql_string(kind)}' for column, kind in types.items()) + '}'
+
+
+class DuckDBStudyIndex:
+    """``StudyIndex`` answered by DuckDB over Parquet copies of the two study CSVs.
+
+    The metadata and results tables stay separate on disk; every lookup is an
+    aggregate query that joins them inside DuckDB, so only the per-bin or
+    per-timepoint counts reach Python. ``memory_limit`` caps DuckDB's memory
+    per process (it spills to ``snapshot_dir`` beyond that), so studies larger
+    than RAM can be served. The Parquet copies are rebuilt when the CSVs change.
+    """
+
+    def __init__(self, metadata_path, results_path, bin_width=1.0, snapshot_dir=None, memory_limit=None,
+                 verify=None):
+        if duckdb is None:
+            raise ImportError('The DuckDB study backend needs the duckdb package')
+        snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+        verify = verify or os.environ.get('DATA_SNAPSHOT_VERIFY', 'mtime')
+        self.version = fingerprint_version(source_fingerprint([metadata_path, results_path], verify))
+        os.makedirs(snapshot_dir, exist_ok=True)
+        self.connection = duckdb.connect(config={
+            'memory_limit': memory_limit or os.environ.get('MOUSE_DUCKDB_MEMORY_LIMIT', '512MB'),
+            'temp_directory': os.path.join(snapshot_dir, 'duckdb.tmp'),
+        })
+        for table, path, types in (('metadata', metadata_path, MOUSE_METADATA_TYPES),
+                                   ('results', results_path, STUDY_RESULTS_TYPES)):
+            parquet_path = os.path.join(snapshot_dir, f'mouse_{table}.{self.version}.parquet')
+            if not os.path.exists(parquet_path):
+                self.write_parquet(path, parquet_path, types)
+                for stale_path in glob.glob(os.path.join(snapshot_dir, f'mouse_{table}.*.parquet')):
+                    if stale_path != parquet_path:
+                        os.remove(stale_path)
+            self.connection.execute(
+                f'CREATE VIEW {table} AS SELECT * FROM read_parquet({sql_string(parquet_path)})')
+
+        self.regimens = [row[0] for row in self.connection.execute(
+            'SELECT DISTINCT "Drug Regimen" FROM metadata WHERE "Drug Regimen" IS NOT NULL ORDER BY 1').fetchall()]
+        low, high = self.connection.execute('SELECT min("Weight (g)"), max("Weight (g)") FROM metadata').fetchone()
+        self.bin_width = bin_width
+        self.bin_start, self.bin_edges, self.bin_centers = weight_bins(low, high, bin_width)
+        # A mouse still measured at the last timepoint of the study is censored there
+        self.final_timepoint, = self.connection.execute(
+            'SELECT max(Timepoint) FROM results JOIN metadata USING ("Mouse ID")').fetchone()
+        self.all_mouse_weight_counts = self.bin_counts('FROM metadata WHERE "Weight (g)" IS NOT NULL')
+
+    def write_parquet(self, csv_path, parquet_path, types):
+        tmp_path = f'{parquet_path}.{os.getpid()}.tmp'
+        self.connection.execute(
+            f'COPY (SELECT * FROM read_csv({sql_string(csv_path)}, header = true, types = {sql_types(types)}))'
+            f' TO {sql_string(tmp_path)} (FORMAT parquet)')
+        os.replace(tmp_path, parquet_path)
+
+    def query(self, sql, params=()):
+        # One cursor per query: a DuckDB connection must not be shared between request threads
+        cursor = self.connection.cursor()
+        try:
+            return cursor.execute(sql, params).fetchall()
+        finally:
+            cursor.close()
+
+    def bin_counts(self, source, params=()):
+        rows = self.query(
+            f'SELECT CAST(floor(("Weight (g)" - ?) / ?) AS BIGINT) AS bin, count(*) {source} GROUP BY bin',
+            (self.bin_start, self.bin_width, *params))
+        counts = np.zeros(len(self.bin_centers), dtype=np.int64)
+        for position, count in rows:
+            counts[position] = count
+        return counts
+
+    def append_metadata(self, mouse_data):
+        # The Parquet copies are rebuilt from the CSVs instead of patched
+        return False
+
+    def append_results(self, study_results):
+        return False
+
+    @timed_phase('filter')
+    def regimen_weight_counts(self, drug):
+        return self.bin_counts(
+            'FROM results JOIN metadata USING ("Mouse ID")'
+            ' WHERE "Drug Regimen" = ? AND "Weight (g)" IS NOT NULL', (drug,))
+
+    @timed_phase('filter')
+    def regimen_mouse_weight_counts(self, drug):
+        return self.bin_counts('FROM metadata WHERE "Drug Regimen" = ? AND "Weight (g)" IS NOT NULL', (drug,))
+
+    @timed_phase('filter')
+    def regimen_timepoint_counts(self, drug):
+        rows = self.query(
+            'SELECT Timepoint, count(*) FROM results JOIN metadata USING ("Mouse ID")'
+            ' WHERE "Drug Regimen" = ? GROUP BY Timepoint ORDER BY Timepoint', (drug,))
+        timepoints, counts = zip(*rows) if rows else ((), ())
+        return pd.Series(counts, index=pd.Index(timepoints, name='Timepoint'), dtype='int64')
+
+    @timed_phase('filter')
+    def regimen_survival_curve(self, drug):
+        rows = self.query(
+            'WITH per_mouse AS ('
+            ' SELECT max(Timepoint) AS exit FROM results JOIN metadata USING ("Mouse ID")'
+            ' WHERE "Drug Regimen" = ? GROUP BY "Mouse ID")'
+            ' SELECT exit, count(*), count(*) FILTER (WHERE exit < ?) FROM per_mouse GROUP BY exit ORDER BY exit',
+            (drug, self.final_timepoint))
+        if not rows:
+            return None
+        exits = pd.DataFrame(rows, columns=['exit', 'size', 'sum']).set_index('exit')
+        return survival_curve(exits)
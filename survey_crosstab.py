@@ -0,0 +1,135 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# Short names the weather-check notebooks give the survey's question columns
+QUESTION_COLUMNS = {
+    'Do you typically check a daily weather report?': 'Question 1',
+    'How do you typically check the weather?': 'Question 2',
+    'A specific website or app (please provide the answer)': 'Question 3',
+    'If you had a smartwatch (like the soon to be released Apple Watch), how likely or unlikely would you be to '
+    'check the weather on that device?': 'Question 4',
+    'Age': 'Question 5',
+    'What is your gender?': 'Question 6',
+    'How much total combined money did all members of your HOUSEHOLD earn last year?': 'Question 7',
+}
+
+# The survey export marks skipped questions with '-'
+SKIPPED_ANSWER = '-'
+SKIPPED_LABEL = 'Prefer not to answer'
+
+
+def read_weather_check(path):
+    """Read the weather-check survey with short question names and skipped answers labelled."""
+    df = pd.read_csv(path, dtype=str).rename(columns=QUESTION_COLUMNS)
+    answer_columns = [column for column in df.columns if column != 'RespondentID']
+    df[answer_columns] = df[answer_columns].replace(SKIPPED_ANSWER, SKIPPED_LABEL)
+    return df
+
+
+class SurveyCrosstab:
+    """Crosstabs of survey answers by demographic, counted in one pass and cached per pair.
+
+    Every answer column is encoded as a categorical once. ``crosstabs`` then
+    turns each requested (group, question) pair into offsets into one flat
+    count array, so all pairs are counted by a single ``np.bincount``. Each
+    result is a pair of frames like ``df.groupby(group)[[question]]
+    .value_counts().unstack().fillna(0)``: the raw counts and the row
+    percentages (``normalize=True`` times 100).
+    """
+
+    def __init__(self, df, columns=None):
+        columns = columns or [column for column in df.columns if column != 'RespondentID']
+        self.codes = {}
+        self.categories = {}
+        for column in columns:
+            encoded = pd.Categorical(df[column])
+            self.codes[column] = encoded.codes
+            self.categories[column] = encoded.categories
+        self.cache = {}
+
+    def crosstabs(self, pairs):
+        """Return ``{(group, question): (counts, percentages)}``, counting the uncached pairs in one pass."""
+        missing = [pair for pair in dict.fromkeys(pairs) if pair not in self.cache]
+        if missing:
+            keys, blocks, offset = [], [], 0
+            for group, question in missing:
+                group_codes, answer_codes = self.codes[group], self.codes[question]
+                shape = (len(self.categories[group]), len(self.categories[question]))
+                # Unanswered cells (code -1) are left out, as value_counts drops them
+                answered = (group_codes >= 0) & (answer_codes >= 0)
+                keys.append(offset + group_codes[answered].astype(np.int64) * shape[1] + answer_codes[answered])
+                blocks.append((offset, shape))
+                offset += shape[0] * shape[1]
+            counts = np.bincount(np.concatenate(keys), minlength=offset)
+            for (group, question), (start, shape) in zip(missing, blocks):
+                self.cache[(group, question)] = self.tables(
+                    counts[start:start + shape[0] * shape[1]].reshape(shape), group, question)
+        return {pair: self.cache[pair] for pair in pairs}
+
+    def crosstab(self, group, question):
+        return self.crosstabs([(group, question)])[(group, question)]
+
+    def tables(self, counts, group, question):
+        # Only the groups and answers that occur together, like value_counts().unstack()
+        rows, columns = counts.any(axis=1), counts.any(axis=0)
+        counts = pd.DataFrame(
+            counts[rows][:, columns],
+            index=pd.Index(self.categories[group][rows], name=group),
+            columns=pd.Index(self.categories[question][columns], name=question)
+        )
+        percentages = counts.div(counts.sum(axis=1), axis=0) * 100
+        return counts, percentages
+
+
+def survey_results(table):
+    """The ``results`` dict ``survey`` takes: each row of a crosstab, rounded."""
+    return {label: row.round() for label, row in zip(table.index, table.to_numpy())}
+
+
+def survey(results, category_names, ax=None):
+    """Horizontal stacked bars, one per key of ``results``, one segment per category."""
+    labels = list(results.keys())
+    data = np.array(list(results.values()))
+    data_cum = data.cumsum(axis=1)
+    category_colors = plt.get_cmap('RdYlGn')(
+        np.linspace(0.15, 0.85, data.shape[1]))
+
+    if ax is None:
+        fig, ax = plt.subplots(figsize=(9.2, 5))
+    else:
+        fig = ax.figure
+    ax.invert_yaxis()
+    ax.xaxis.set_visible(False)
+    ax.set_xlim(0, np.sum(data, axis=1).max())
+
+    for i, (colname, color) in enumerate(zip(category_names, category_colors)):
+        widths = data[:, i]
+        starts = data_cum[:, i] - widths
+        ax.barh(labels, widths, left=starts, height=0.5,
+                label=colname, color=color)
+        xcenters = starts + widths / 2
+
+        r, g, b, _ = color
+        text_color = 'white' if r * g * b < 0.5 else 'darkgrey'
+        for y, (x, c) in enumerate(zip(xcenters, widths)):
+            ax.text(x, y, str(int(c)), ha='center', va='center',
+                    color=text_color)
+    ax.legend(ncol=len(category_names), bbox_to_anchor=(0, 1),
+              loc='lower left', fontsize='small')
+
+    return fig, ax
+
+
+def plot_question_matrix(crosstab, group, questions, row_height=4):
+    """One row of subplots per question: the row percentages and the raw counts by ``group``."""
+    tables = crosstab.crosstabs([(group, question) for question in questions])
+    fig, axs = plt.subplots(nrows=len(questions), ncols=2, figsize=(18, row_height * len(questions)), squeeze=False)
+    for (percent_ax, count_ax), question in zip(axs, questions):
+        counts, percentages = tables[(group, question)]
+        survey(survey_results(percentages), list(percentages.columns), ax=percent_ax)
+        percent_ax.set_title(f'{question}: percentage of responses by {group}')
+        survey(survey_results(counts), list(counts.columns), ax=count_ax)
+        count_ax.set_title(f'{question}: responses by {group}')
+    fig.tight_layout()
+    return fig, axs
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import matplotlib
+import pytest
+
+matplotlib.use('Agg')
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from bench_callbacks import write_world_data  # noqa: E402
+from wsgi import load_script  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def world_app(tmp_path_factory):
+    """The world dashboard loaded from a small synthetic CSV."""
+    directory = tmp_path_factory.mktemp('world')
+    path = write_world_data(str(directory), 600)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('WORLD_DATA_CSV', path)
+        patch.setenv('DATA_SNAPSHOT_DIR', str(directory / 'snapshots'))
+        patch.setenv('WORLD_PREBUILD', '0')
+        yield load_script('world_data_2023.app.py', 'world_data_2023_app')
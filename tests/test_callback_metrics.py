@@ -0,0 +1,26 @@
+import cProfile
+import os
+
+from callback_metrics import CallbackMetrics
+
+
+def test_sampled_call_runs_while_another_profiler_is_active(tmp_path):
+    metrics = CallbackMetrics(profile_dir=str(tmp_path), profile_threshold=0.0, profile_sample_rate=1.0)
+
+    @metrics.instrument
+    def build(value):
+        return value * 2
+
+    outer = cProfile.Profile()
+    outer.enable()
+    try:
+        assert build(21) == 42
+    finally:
+        outer.disable()
+    assert ('build', 'build') in metrics.histograms
+
+
+def test_sampled_call_writes_its_profile(tmp_path):
+    metrics = CallbackMetrics(profile_dir=str(tmp_path), profile_threshold=0.0, profile_sample_rate=1.0)
+    assert metrics.instrument(sum)([1, 2]) == 3
+    assert [name.startswith('sum-') and name.endswith('.prof') for name in os.listdir(tmp_path)] == [True]
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from scipy.stats import kurtosis, skew
+
+from wsgi import load_script
+
+clt = load_script('Central limit theorem whit matplotlib.py', 'clt')
+
+
+@pytest.fixture
+def sample():
+    # Recorded dice means, as DiceSimulation produces them
+    return clt.DiceSimulation(n_dice=3, faces=6, seed=0).run(10_000)
+
+
+def assert_matches_scipy(accumulator, values):
+    assert accumulator.count == len(values)
+    assert accumulator.mean == pytest.approx(values.mean())
+    assert accumulator.variance == pytest.approx(values.var())
+    assert accumulator.skewness == pytest.approx(skew(values))
+    assert accumulator.kurtosis == pytest.approx(kurtosis(values))
+
+
+def test_moments_from_values(sample):
+    assert_matches_scipy(clt.MomentAccumulator.from_values(sample), sample)
+
+
+def test_moments_updated_in_chunks(sample):
+    accumulator = clt.MomentAccumulator()
+    for chunk in np.array_split(sample, 37):
+        accumulator.update(chunk)
+    assert_matches_scipy(accumulator, sample)
+
+
+def test_moments_merged_from_workers(sample):
+    parts = [clt.MomentAccumulator.from_values(chunk) for chunk in np.array_split(sample, [1, 2, 500, 7000])]
+    merged = clt.MomentAccumulator()
+    for part in parts:
+        merged.merge(part)
+    assert_matches_scipy(merged, sample)
+
+
+def test_moments_of_constant_values():
+    accumulator = clt.MomentAccumulator.from_values(np.full(10, 3.5))
+    assert accumulator.variance == 0
+    assert np.isnan(accumulator.skewness)
+    assert np.isnan(accumulator.kurtosis)
+
+
+@pytest.mark.parametrize('n_dice, faces, bins', [(3, 6, 20), (10, 4, 10), (10, 6, 30), (10, 8, 10), (7, 6, 20),
+                                                  (2, 20, 39), (1, 6, 6)])
+def test_histogram_matches_numpy(n_dice, faces, bins):
+    sample = clt.DiceSimulation(n_dice=n_dice, faces=faces, seed=0).run(10_000)
+    histogram = clt.HistogramAccumulator(0.5, faces + 0.5, bins)
+    for chunk in np.array_split(sample, 13):
+        histogram.update(chunk)
+    counts, edges = np.histogram(sample, bins=bins, range=(0.5, faces + 0.5))
+    np.testing.assert_array_equal(histogram.edges, edges)
+    np.testing.assert_array_equal(histogram.counts, counts)
+
+
+def test_histogram_merge_and_out_of_range_values(sample):
+    values = np.concatenate([sample, [0.0, 1.0, 7.0]])
+    merged = clt.HistogramAccumulator(1, 6, 10)
+    for chunk in np.array_split(values, 4):
+        merged.merge(clt.HistogramAccumulator(1, 6, 10).update(chunk))
+    counts, _ = np.histogram(values, bins=10, range=(1, 6))
+    np.testing.assert_array_equal(merged.counts, counts)
+    with pytest.raises(ValueError):
+        merged.merge(clt.HistogramAccumulator(0, 6, 10))
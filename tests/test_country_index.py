@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def frame():
+    """Repeated countries, tied values and NaNs."""
+    rng = np.random.default_rng(0)
+    rows = 5_000
+    frame = pd.DataFrame({
+        'Country': rng.choice([f'Country {i}' for i in range(60)], rows),
+        'GDP per capita': rng.integers(0, 50, rows).astype(float),
+        'Population': rng.lognormal(10, 2, rows),
+    })
+    frame.loc[rng.random(rows) < 0.05, 'GDP per capita'] = np.nan
+    frame.loc[rng.random(rows) < 0.05, 'Population'] = np.nan
+    return frame
+
+
+SELECTIONS = [[], ['Country 3'], ['Country 7', 'Country 1', 'Country 42'], ['Country 5', 'Unknown'], ['Unknown']]
+
+
+@pytest.mark.parametrize('countries', SELECTIONS)
+def test_select_matches_isin(world_app, frame, countries):
+    index = world_app.CountryIndex(frame)
+    expected = frame[frame['Country'].isin(countries)] if countries else frame
+    pd.testing.assert_frame_equal(index.select(countries), expected)
+
+
+@pytest.mark.parametrize('countries', SELECTIONS)
+@pytest.mark.parametrize('column', ['GDP per capita', 'Population'])
+@pytest.mark.parametrize('n', [1, 10, 1_000])
+def test_top_matches_nlargest(world_app, frame, countries, column, n):
+    index = world_app.CountryIndex(frame)
+    selected = frame[frame['Country'].isin(countries)] if countries else frame
+    pd.testing.assert_frame_equal(index.top(countries, column, n), selected.nlargest(n, column))
+
+
+def test_extended_matches_rebuilt_index(world_app, frame):
+    head, tail = frame.iloc[:4_000], frame.iloc[4_000:]
+    extended = world_app.CountryIndex(head).extended(tail)
+    rebuilt = world_app.CountryIndex(frame)
+    for countries in SELECTIONS:
+        pd.testing.assert_frame_equal(extended.select(countries), rebuilt.select(countries))
+        for column in ('GDP per capita', 'Population'):
+            pd.testing.assert_frame_equal(extended.top(countries, column), rebuilt.top(countries, column))
+
+
+def test_app_index_covers_loaded_data(world_app):
+    countries = sorted(world_app.data['Country'].unique())[:5]
+    expected = world_app.data[world_app.data['Country'].isin(countries)]
+    pd.testing.assert_frame_equal(world_app.country_index.select(countries), expected)
+    pd.testing.assert_frame_equal(world_app.country_index.top(countries, 'Population'),
+                                  expected.nlargest(10, 'Population'))
+
+
+def test_top_fills_with_nan_rows_like_nlargest(world_app):
+    frame = pd.DataFrame({'Country': ['A', 'B', 'A', 'C'], 'GDP per capita': [np.nan, 2.0, 1.0, np.nan],
+                          'Population': [np.nan] * 4})
+    index = world_app.CountryIndex(frame)
+    for countries in ([], ['A', 'C']):
+        selected = frame[frame['Country'].isin(countries)] if countries else frame
+        for column in ('GDP per capita', 'Population'):
+            pd.testing.assert_frame_equal(index.top(countries, column, 3), selected.nlargest(3, column))
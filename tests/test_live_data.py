@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+
+from bench_callbacks import write_mouse_study
+from live_data import LiveReloader
+from wsgi import load_script
+
+
+def append_row(path, value):
+    with open(path, 'a') as file:
+        file.write(f'{value}\n')
+
+
+def test_rows_appended_during_a_reload_are_not_lost(tmp_path):
+    path = str(tmp_path / 'values.csv')
+    with open(path, 'w') as file:
+        file.write('value\n1\n')
+    totals, appended = [], [False]
+
+    def reload():
+        totals.append(pd.read_csv(path)['value'].sum())
+        if not appended[0]:
+            # A writer appends right after reload() has read the file
+            appended[0] = True
+            append_row(path, 10)
+
+    reloader = LiveReloader(reload, on_version=lambda version: None)
+    reloader.watch(path, lambda rows: False)
+    append_row(path, 2)
+    assert reloader.check()
+    assert totals == [3] and reloader.reload_pending
+    assert reloader.check()
+    assert totals == [3, 13] and not reloader.reload_pending
+    assert not reloader.check()
+
+
+def test_appended_rows_are_applied_as_a_delta(tmp_path):
+    path = str(tmp_path / 'values.csv')
+    with open(path, 'w') as file:
+        file.write('value\n1\n')
+    applied = []
+    reloader = LiveReloader(lambda: applied.append('reload'), on_version=lambda version: None)
+    reloader.watch(path, lambda rows: applied.extend(rows['value']) or True)
+    append_row(path, 2)
+    append_row(path, 3)
+    assert reloader.check()
+    assert applied == [2, 3]
+    assert not reloader.check()
+
+
+def test_mouse_app_picks_up_a_new_regimen(tmp_path):
+    metadata_path, results_path = write_mouse_study(str(tmp_path), 600)
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('MOUSE_METADATA_CSV', metadata_path)
+        patch.setenv('STUDY_RESULTS_CSV', results_path)
+        patch.setenv('DATA_SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+        patch.setenv('MOUSE_LIVE_RELOAD', '1')
+        app = load_script('dash_app_mous.py', 'dash_app_mous_live')
+    with open(metadata_path, 'a') as file:
+        file.write('new1,NewDrug,Male,10,20\n')
+    with open(results_path, 'a') as file:
+        file.write('new1,0,45.0,0\nnew1,5,46.0,1\n')
+    assert app.live_reloader.check()
+
+    checklist_options, radio_options = app.update_regimen_options(app.figure_cache.version)
+    assert {'label': 'NewDrug', 'value': 'NewDrug'} in checklist_options
+    assert checklist_options == radio_options
+    histogram = app.update_weight_histogram(['NewDrug'], app.figure_cache.version)
+    assert histogram['data'][0]['marker']['color'] == app.drug_color('NewDrug')
+    assert app.update_weight_distribution('NewDrug', app.figure_cache.version)['data']
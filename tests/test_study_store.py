@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench_callbacks import write_mouse_study
+from data_loading import read_mouse_study
+from wsgi import load_script
+
+pytest.importorskip('duckdb')
+
+from study_store import DuckDBStudyIndex  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def study_paths(tmp_path_factory):
+    """A synthetic study with fractional and missing weights and results of mice without metadata."""
+    directory = tmp_path_factory.mktemp('mouse')
+    metadata_path, results_path = write_mouse_study(str(directory), 3000)
+    metadata = pd.read_csv(metadata_path)
+    metadata['Weight (g)'] = metadata['Weight (g)'] + np.where(metadata.index % 3 == 0, 0.5, 0.0)
+    metadata.loc[metadata.index % 17 == 0, 'Weight (g)'] = np.nan
+    metadata.iloc[:-5].to_csv(metadata_path, index=False)
+    return metadata_path, results_path
+
+
+@pytest.fixture(scope='module')
+def mouse_app(study_paths, tmp_path_factory):
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('MOUSE_METADATA_CSV', study_paths[0])
+        patch.setenv('STUDY_RESULTS_CSV', study_paths[1])
+        patch.setenv('DATA_SNAPSHOT_DIR', str(tmp_path_factory.mktemp('snapshots')))
+        yield load_script('dash_app_mous.py', 'dash_app_mous_study_store')
+
+
+@pytest.fixture(scope='module', params=[1.0, 2.5])
+def indexes(request, study_paths, mouse_app, tmp_path_factory):
+    frames = read_mouse_study(*study_paths)
+    pandas_index = mouse_app.StudyIndex(frames['merged_df'], frames['mouse_data'], request.param)
+    duckdb_index = DuckDBStudyIndex(*study_paths, request.param, snapshot_dir=str(tmp_path_factory.mktemp('duckdb')))
+    return pandas_index, duckdb_index
+
+
+def test_bins_and_regimens_match(indexes):
+    pandas_index, duckdb_index = indexes
+    assert duckdb_index.regimens == pandas_index.regimens
+    np.testing.assert_allclose(duckdb_index.bin_edges, pandas_index.bin_edges)
+    np.testing.assert_array_equal(duckdb_index.all_mouse_weight_counts, pandas_index.all_mouse_weight_counts)
+
+
+@pytest.mark.parametrize('drug', ['Capomulin', 'Placebo', 'Zoniferol', 'Unknown'])
+def test_regimen_lookups_match(indexes, drug):
+    pandas_index, duckdb_index = indexes
+    np.testing.assert_array_equal(duckdb_index.regimen_weight_counts(drug), pandas_index.regimen_weight_counts(drug))
+    np.testing.assert_array_equal(duckdb_index.regimen_mouse_weight_counts(drug),
+                                  pandas_index.regimen_mouse_weight_counts(drug))
+    pd.testing.assert_series_equal(duckdb_index.regimen_timepoint_counts(drug),
+                                   pandas_index.regimen_timepoint_counts(drug),
+                                   check_names=False, check_index_type=False)
+    expected = pandas_index.regimen_survival_curve(drug)
+    actual = duckdb_index.regimen_survival_curve(drug)
+    if expected is None:
+        assert actual is None
+    else:
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_index_type=False)
@@ -0,0 +1,47 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from world_map import ChoroplethMap
+
+
+def choropleth_map(countries):
+    data = pd.DataFrame({'Country': countries, 'Density': np.arange(1.0, len(countries) + 1)})
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return ChoroplethMap(data, 'Density', 'Density')
+
+
+def patched_arrays(patch):
+    return {tuple(operation['location']): operation['params']['value']
+            for operation in patch.to_plotly_json()['operations']}
+
+
+@pytest.mark.parametrize('countries', [
+    ['France', 'Japan', 'Brazil'],
+    ['Atlantis', 'Lemuria', 'Hyperborea'],
+    ['France', 'Atlantis', 'Japan', 'Lemuria'],
+])
+def test_each_trace_gets_the_colours_of_its_rows(countries):
+    choropleth = choropleth_map(countries)
+    figure = choropleth.figure()
+    assert len(figure.data) == len(choropleth.rows)
+    for trace, rows in zip(figure.data, choropleth.rows):
+        assert len(trace.z) == len(rows)
+
+    selected = [position for position, country in enumerate(countries) if country in ('Japan', 'Atlantis')]
+    arrays = patched_arrays(choropleth.patch(selected))
+    assert set(arrays) == {('data', index, 'z') for index in range(len(figure.data))}
+    for index, rows in enumerate(choropleth.rows):
+        expected = [float(position + 1) if position in selected else np.nan for position in rows]
+        np.testing.assert_array_equal(arrays[('data', index, 'z')], expected)
+        np.testing.assert_array_equal(choropleth.figure(selected).data[index].z, expected)
+
+
+def test_unresolved_names_are_located_by_name():
+    figure = choropleth_map(['Atlantis', 'Lemuria', 'Hyperborea']).figure()
+    assert len(figure.data[0].locations) == 0
+    assert list(figure.data[1].locations) == ['Atlantis', 'Lemuria', 'Hyperborea']
+    assert figure.data[1].locationmode == 'country names'
@@ -1,48 +1,191 @@
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import dash
-from dash import dcc, html, Input, Output
+from dash import ctx, dcc, html, Input, Output, State
 import plotly.express as px
+import plotly.io as pio
 import pandas as pd
 import numpy as np
 
-# Load and clean the data
-data = pd.read_csv("C:/Users/HP/Desktop/DATA__VIZUALI/world-data-2023.csv")
-
-# Clean country names
-data["Country"] = data["Country"].str.replace("S�����������", "")
-data["Country"] = data["Country"].replace("", np.nan)
-data = data.dropna(subset=['Country'])
-
-# List of numerical variables for conversion
-NumericalVariables = [
-    'Density\n(P/Km2)', 'Agricultural Land( %)', 'Land Area(Km2)', 'Armed Forces size', 'Birth Rate',
-    'Co2-Emissions', 'CPI', 'CPI Change (%)', 'Fertility Rate', 'Forested Area (%)', 'Gasoline Price',
-    'GDP', 'Gross primary education enrollment (%)', 'Gross tertiary education enrollment (%)',
-    'Infant mortality', 'Life expectancy', 'Maternal mortality ratio', 'Minimum wage',
-    'Out of pocket health expenditure', 'Physicians per thousand', 'Population',
-    'Population: Labor force participation (%)', 'Tax revenue (%)', 'Total tax rate',
-    'Unemployment rate', 'Urban_population'
-]
-
-# Clean and convert numerical variables
-for variable in NumericalVariables:
-    if data[variable].dtype == 'object':
-        data[variable] = data[variable].str.replace(',', '').str.replace('%', '').str.replace('$', '')
-        data[variable] = data[variable].astype(float)
-
-# Fill missing numerical data with column mean
-for variable in NumericalVariables:
-    data[variable].fillna(data[variable].mean(), inplace=True)
-
-# Create a new column for GDP per capita
-data['GDP per capita'] = data['GDP'] / data['Population']
+from callback_metrics import CallbackMetrics, timed_phase
+from data_loading import (WORLD_DATA_DTYPES, WORLD_NUMERICAL_COLUMNS, cached_frames, clean_world_data,
+                          configured_path, read_world_data)
+from figure_cache import FigureCache
+from figure_payload import figure_store_id, minimize_figure, minimized, shared_layout_graph
+from large_scatter import scatter, scatter_3d, zoom_view
+from live_data import LiveReloader
+from world_map import ChoroplethMap
+
+# Load and clean the data (from a binary snapshot when the CSV has not changed)
+world_data_path = configured_path('world-data', 'WORLD_DATA_CSV', "C:/Users/HP/Desktop/DATA__VIZUALI/world-data-2023.csv")
+world_frames, world_version = cached_frames('world_data', [world_data_path], lambda: read_world_data(world_data_path))
+data = world_frames['data']
+
+
+class CountryIndex:
+    """Row positions per country and presorted rankings, built once at startup.
+
+    Filtering becomes a positional ``take`` of the selected countries' rows and
+    a top-N query only ranks the selected rows by their precomputed position in
+    the descending order of the column, so requests do not scan the whole frame.
+    ``extended`` indexes appended rows without re-sorting the existing ones.
+    """
+
+    def __init__(self, data, ranked_columns=('GDP per capita', 'Population')):
+        self.data = data
+        self.positions = self.country_positions(data['Country'])
+        self.rank = {}
+        for column in ranked_columns:
+            self.rank_by(column, np.arange(len(data)))
+
+    @staticmethod
+    def country_positions(countries, offset=0):
+        countries = pd.Categorical(countries)
+        codes = countries.codes
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(countries.categories) + 1))
+        return {
+            country: offset + order[bounds[code]:bounds[code + 1]] for code, country in enumerate(countries.categories)
+        }
+
+    def rank_by(self, column, candidates):
+        """Rank the row positions ``candidates`` by descending ``column``; ties keep their order in ``candidates``."""
+        values = self.data[column].to_numpy(dtype=float)
+        valid = candidates[~np.isnan(values[candidates])]
+        descending = valid[np.argsort(-values[valid], kind='stable')]
+        rank = np.full(len(self.data), len(self.data))
+        rank[descending] = np.arange(len(descending))
+        self.rank[column] = (rank, descending)
+
+    def extended(self, rows):
+        """A new index of ``data`` plus the appended ``rows``.
+
+        The old descending orders are already sorted, so ranking them together
+        with the new rows is a near-linear merge rather than a full sort.
+        """
+        index = CountryIndex.__new__(CountryIndex)
+        index.data = pd.concat([self.data, rows])
+        index.positions = dict(self.positions)
+        for country, positions in self.country_positions(rows['Country'], offset=len(self.data)).items():
+            known = self.positions.get(country)
+            index.positions[country] = positions if known is None else np.concatenate([known, positions])
+        index.rank = {}
+        added = np.arange(len(self.data), len(index.data))
+        for column, (_, descending) in self.rank.items():
+            index.rank_by(column, np.concatenate([descending, added]))
+        return index
+
+    def select_positions(self, countries):
+        chunks = [self.positions[country] for country in countries if country in self.positions]
+        return np.sort(np.concatenate(chunks)) if chunks else np.empty(0, dtype=np.intp)
+
+    def select(self, countries):
+        if not countries:
+            return self.data
+        return self.data.take(self.select_positions(countries))
+
+    @timed_phase('filter')
+    def top(self, countries, column, n=10):
+        """Same rows as ``select(countries).nlargest(n, column)``."""
+        rank, descending = self.rank[column]
+        if not countries:
+            positions = descending[:n]
+            unranked = np.flatnonzero(rank == len(self.data)) if len(positions) < n else None
+        else:
+            positions = self.select_positions(countries)
+            ranks = rank[positions]
+            unranked = positions[ranks == len(self.data)]
+            positions, ranks = positions[ranks < len(self.data)], ranks[ranks < len(self.data)]
+            if len(ranks) > n:
+                nearest = np.argpartition(ranks, n)[:n]
+                positions, ranks = positions[nearest], ranks[nearest]
+            positions = positions[np.argsort(ranks)]
+        if len(positions) < n:
+            # Like nlargest, rows with NaN fill the remaining places in their original order
+            positions = np.concatenate([positions, unranked[:n - len(positions)]])
+        return self.data.take(positions)
+
+
+country_index = CountryIndex(data)
+
+# Country names are resolved to ISO codes and the map figure is built once;
+# selections only patch its colour array
+choropleth_map = ChoroplethMap(data, "Density\n(P/Km2)", "Population Density by Country")
 
 # Create Dash app
 app = dash.Dash(__name__)
 server = app.server
 
+# Every figure uses plotly's default template; the page carries it once and the
+# browser adds it to each panel (see figure_payload.shared_layout_graph)
+shared_layout = {'template': pio.templates[pio.templates.default].to_plotly_json()}
+
+figure_cache = FigureCache(
+    maxsize=int(os.environ.get('WORLD_FIGURE_CACHE_SIZE', 1024)),
+    directory=os.environ.get('WORLD_FIGURE_CACHE_DIR'),
+    version=world_version
+)
+
+# Per-callback filter/build/serialize latency histograms, served on /metrics
+metrics = CallbackMetrics.from_env().init_app(app)
+
+# With WORLD_LIVE_RELOAD=1, rows appended to the CSV are added to the country
+# index and the map, and open pages are refreshed through the data-version
+# store below
+live_reload = os.environ.get('WORLD_LIVE_RELOAD', '0') == '1'
+live_reload_interval = float(os.environ.get('LIVE_RELOAD_INTERVAL', 2.0))
+prebuild = os.environ.get('WORLD_PREBUILD', '1') == '1'
+
+# Scatter panels switch to one WebGL trace above WORLD_WEBGL_POINTS rows and
+# to a server-side density aggregate (recomputed at the current zoom) above
+# WORLD_DENSITY_POINTS rows
+webgl_points = int(os.environ.get('WORLD_WEBGL_POINTS', 1000))
+density_points = int(os.environ.get('WORLD_DENSITY_POINTS', 50_000))
+density_bins = int(os.environ.get('WORLD_DENSITY_BINS', 200))
+
+
+def append_world_rows(rows):
+    """Clean appended rows (gaps filled with the current column means) and index them."""
+    global data, country_index, choropleth_map
+    rows = clean_world_data(rows, fill=country_index.data[WORLD_NUMERICAL_COLUMNS].mean())
+    rows.index = pd.RangeIndex(len(rows)) + (country_index.data.index.max() + 1)
+    extended_index = country_index.extended(rows)
+    choropleth_map = choropleth_map.extended(extended_index.data)
+    data = extended_index.data
+    country_index = extended_index
+    return True
+
+
+def reload_world_data():
+    global data, country_index, choropleth_map
+    frames, _ = cached_frames('world_data', [world_data_path], lambda: read_world_data(world_data_path))
+    reloaded_index = CountryIndex(frames['data'])
+    choropleth_map = ChoroplethMap(frames['data'], "Density\n(P/Km2)", "Population Density by Country")
+    data = frames['data']
+    country_index = reloaded_index
+
+
+def set_world_version(version):
+    figure_cache.set_version(version)
+    if prebuild:
+        update_graphs([])
+
+
+# The watcher is only set up when live reload is on
+live_reloader = None
+if live_reload:
+    live_reloader = LiveReloader(reload_world_data, set_world_version, live_reload_interval)
+    live_reloader.watch(world_data_path, append_world_rows, WORLD_DATA_DTYPES)
+    server.before_request(live_reloader.start)
+
 # App layout
 app.layout = html.Div([
     html.H1("World Data Dashboard"),
+    dcc.Interval(id='data-refresh', interval=live_reload_interval * 1000, disabled=not live_reload),
+    dcc.Store(id='data-version', data=figure_cache.version),
+    dcc.Store(id='shared-layout', data=shared_layout),
 
     dcc.Dropdown(
         id='country-filter',
@@ -53,83 +196,157 @@ app.layout = html.Div([
     ),
 
     html.Div([
-        dcc.Graph(id='choropleth-map', style={'display': 'inline-block'}),
-        dcc.Graph(id='scatter-plot', style={'display': 'inline-block'})
+        dcc.Graph(id='choropleth-map', figure=minimize_figure(choropleth_map.figure()), style={'display': 'inline-block'}),
+        *shared_layout_graph(app, 'scatter-plot', style={'display': 'inline-block'})
     ]),
 
     html.Div([
-        dcc.Graph(id='bar-chart', style={'display': 'inline-block'}),
-        dcc.Graph(id='bubble-chart', style={'display': 'inline-block'})
+        *shared_layout_graph(app, 'bar-chart', style={'display': 'inline-block'}),
+        *shared_layout_graph(app, 'bubble-chart', style={'display': 'inline-block'})
     ]),
 
     html.Div([
-        dcc.Graph(id='pie-chart', style={'display': 'inline-block'}),
-        dcc.Graph(id='gdp-per-capita-bar-chart', style={'display': 'inline-block'})
+        *shared_layout_graph(app, 'pie-chart', style={'display': 'inline-block'}),
+        *shared_layout_graph(app, 'gdp-per-capita-bar-chart', style={'display': 'inline-block'})
     ]),
 
     html.Div([
-        dcc.Graph(id='line-chart', style={'display': 'inline-block'}),
-        dcc.Graph(id='urban-population-line-chart', style={'display': 'inline-block'})
+        *shared_layout_graph(app, 'line-chart', style={'display': 'inline-block'}),
+        *shared_layout_graph(app, 'urban-population-line-chart', style={'display': 'inline-block'})
     ]),
 
     html.Div([
-        dcc.Graph(id='violin-plot', style={'display': 'inline-block'}),
-        dcc.Graph(id='treemap', style={'display': 'inline-block'})
+        *shared_layout_graph(app, 'violin-plot', style={'display': 'inline-block'}),
+        *shared_layout_graph(app, 'treemap', style={'display': 'inline-block'})
     ]),
 
     html.Div([
-        dcc.Graph(id='top-10-gdp-per-capita', style={'display': 'inline-block'}),
-        dcc.Graph(id='top-10-population', style={'display': 'inline-block'})
+        *shared_layout_graph(app, 'top-10-gdp-per-capita', style={'display': 'inline-block'}),
+        *shared_layout_graph(app, 'top-10-population', style={'display': 'inline-block'})
     ]),
 
-    dcc.Graph(id='3d-scatter-plot'),
-    dcc.Graph(id='minimum-wage-chart')
+    *shared_layout_graph(app, '3d-scatter-plot'),
+    *shared_layout_graph(app, 'minimum-wage-chart')
 ])
 
-# Callback to update all graphs based on country selection
-@app.callback(
-    [Output('choropleth-map', 'figure'),
-     Output('scatter-plot', 'figure'),
-     Output('bar-chart', 'figure'),
-     Output('bubble-chart', 'figure'),
-     Output('pie-chart', 'figure'),
-     Output('gdp-per-capita-bar-chart', 'figure'),
-     Output('line-chart', 'figure'),
-     Output('urban-population-line-chart', 'figure'),
-     Output('violin-plot', 'figure'),
-     Output('treemap', 'figure'),
-     Output('top-10-gdp-per-capita', 'figure'),
-     Output('top-10-population', 'figure'),
-     Output('3d-scatter-plot', 'figure'),
-     Output('minimum-wage-chart', 'figure')],
-    [Input('country-filter', 'value')]
-)
+# Every chart is its own callback, so a dropdown change only rebuilds (and
+# ships) the panels whose figure is not already cached for that selection.
+panels = {}
+
+
+def panel(graph_id, callback=True, zoomable=False):
+    """Register a figure builder as the callback of ``graph_id``, memoized per sorted selection.
+
+    The callback fills the graph's figure store (see ``shared_layout_graph``),
+    so the template is left out of every response.
+
+    A ``zoomable`` builder also takes the zoomed axis ranges (see
+    ``zoom_view``) and is rebuilt on zoom while its selection has more than
+    ``density_points`` rows, i.e. while it draws an aggregate.
+    """
+    def register(builder):
+        # The map graph is patched in place rather than assembled in the browser, so it keeps its template
+        cached_builder = figure_cache.memoize(minimized(builder, shared_layout if callback else None))
+        panels[graph_id] = cached_builder
+        if callback and zoomable:
+            @functools.wraps(cached_builder)
+            def update(selected_countries, version=None, relayout_data=None):
+                if ctx.triggered_id != graph_id:
+                    return cached_builder(selected_countries)
+                view = zoom_view(relayout_data)
+                if view is None or selected_row_count(selected_countries) <= density_points:
+                    # The browser zooms the points it already has
+                    return dash.no_update
+                if view == {'x': None, 'y': None}:
+                    return cached_builder(selected_countries)
+                return cached_builder(selected_countries, view)
+
+            app.callback(Output(figure_store_id(graph_id), 'data'), Input('country-filter', 'value'),
+                         Input('data-version', 'data'), Input(graph_id, 'relayoutData'))(metrics.instrument(update))
+        elif callback:
+            # A new data version clears the cache, so the version only has to trigger the rebuild
+            @functools.wraps(cached_builder)
+            def update(selected_countries, version=None):
+                return cached_builder(selected_countries)
+
+            app.callback(Output(figure_store_id(graph_id), 'data'), Input('country-filter', 'value'),
+                         Input('data-version', 'data'))(
+                metrics.instrument(update)
+            )
+        return cached_builder
+    return register
+
+
+@timed_phase('filter')
+def filter_countries(selected_countries):
+    return country_index.select(selected_countries)
+
+
 def update_graphs(selected_countries):
-    if selected_countries:
-        filtered_df = data[data['Country'].isin(selected_countries)]
-    else:
-        filtered_df = data
+    """Build every panel for ``selected_countries`` on a thread pool, in layout order."""
+    with ThreadPoolExecutor(max_workers=len(panels)) as executor:
+        return tuple(executor.map(lambda builder: builder(selected_countries), panels.values()))
 
-    fig_choropleth = px.choropleth(
-        filtered_df,
-        locations="Country",
-        locationmode="country names",
-        color="Density\n(P/Km2)",
-        hover_name="Country",
-        color_continuous_scale=px.colors.sequential.Plasma,
-        title="Population Density by Country"
-    )
 
-    fig_scatter = px.scatter(
+def selected_row_count(selected_countries):
+    return len(selected_positions(selected_countries)) if selected_countries else len(data)
+
+
+@timed_phase('filter')
+def selected_positions(selected_countries):
+    return country_index.select_positions(selected_countries) if selected_countries else None
+
+
+# The map graph starts from the prebuilt figure and is only ever patched
+@panel('choropleth-map', callback=False)
+def build_choropleth(selected_countries):
+    return choropleth_map.figure(selected_positions(selected_countries))
+
+
+@app.callback(Output('choropleth-map', 'figure'), Input('country-filter', 'value'), Input('data-version', 'data'),
+              prevent_initial_call=True)
+@metrics.instrument
+def update_choropleth(selected_countries, version=None):
+    if ctx.triggered_id == 'data-version':
+        # New rows change the traces themselves, not just their colours
+        return build_choropleth(selected_countries)
+    return choropleth_map.patch(selected_positions(selected_countries))
+
+
+@app.callback(Output('data-version', 'data'), Input('data-refresh', 'n_intervals'), State('data-version', 'data'))
+@metrics.instrument
+def refresh_data_version(n_intervals, current_version):
+    # Every chart takes the data version as an input, so a new version redraws them all
+    return dash.no_update if figure_cache.version == current_version else figure_cache.version
+
+
+@app.callback(Output('country-filter', 'options'), Input('data-version', 'data'), prevent_initial_call=True)
+@metrics.instrument
+def update_country_options(version):
+    return [{'label': country, 'value': country} for country in data['Country']]
+
+
+@panel('scatter-plot', zoomable=True)
+def build_scatter(selected_countries, view=None):
+    filtered_df = filter_countries(selected_countries)
+    return scatter(
         filtered_df,
         x="Birth Rate",
         y="Co2-Emissions",
+        webgl_points=webgl_points,
+        density_points=density_points,
+        bins=density_bins,
+        view=view,
         text="Country",
         title="Birth Rate vs. CO2 Emissions",
         labels={"Birth Rate": "Birth Rate (per 1000 people)", "Co2-Emissions": "CO2 Emissions (kt)"}
     )
 
-    fig_bar = px.bar(
+
+@panel('bar-chart')
+def build_bar(selected_countries):
+    filtered_df = filter_countries(selected_countries)
+    return px.bar(
         filtered_df,
         x="Country",
         y="Armed Forces size",
@@ -137,10 +354,18 @@ def update_graphs(selected_countries):
         labels={"Armed Forces size": "Armed Forces Size"}
     )
 
-    fig_bubble = px.scatter(
+
+@panel('bubble-chart', zoomable=True)
+def build_bubble(selected_countries, view=None):
+    filtered_df = filter_countries(selected_countries)
+    return scatter(
         filtered_df,
         x="Land Area(Km2)",
         y="Population",
+        webgl_points=webgl_points,
+        density_points=density_points,
+        bins=density_bins,
+        view=view,
         size="Co2-Emissions",
         color="Country",
         hover_name="Country",
@@ -148,14 +373,22 @@ def update_graphs(selected_countries):
         labels={"Land Area(Km2)": "Land Area (Km2)", "Population": "Population"}
     )
 
-    fig_pie = px.pie(
+
+@panel('pie-chart')
+def build_pie(selected_countries):
+    filtered_df = filter_countries(selected_countries)
+    return px.pie(
         filtered_df,
         values='Agricultural Land( %)',
         names='Country',
         title='Agricultural Land Distribution'
     )
 
-    fig_gdp_per_capita = px.bar(
+
+@panel('gdp-per-capita-bar-chart')
+def build_gdp_per_capita(selected_countries):
+    filtered_df = filter_countries(selected_countries)
+    return px.bar(
         filtered_df,
         x="Country",
         y="GDP per capita",
@@ -163,14 +396,22 @@ def update_graphs(selected_countries):
         labels={"GDP per capita": "GDP per Capita (USD)"}
     )
 
-    fig_line = px.line(
+
+@panel('line-chart')
+def build_line(selected_countries):
+    filtered_df = filter_countries(selected_countries)
+    return px.line(
         filtered_df,
         x='Country',
         y='Life expectancy',
         title='Life Expectancy by Country'
     )
 
-    fig_urban_population_line = px.line(
+
+@panel('urban-population-line-chart')
+def build_urban_population_line(selected_countries):
+    filtered_df = filter_countries(selected_countries)
+    return px.line(
         filtered_df,
         x='Country',
         y='Urban_population',
@@ -178,24 +419,33 @@ def update_graphs(selected_countries):
         labels={"Urban_population": "Urban Population (%)"}
     )
 
-    fig_violin = px.violin(
+
+@panel('violin-plot')
+def build_violin(selected_countries):
+    filtered_df = filter_countries(selected_countries)
+    return px.violin(
         filtered_df,
         y='Life expectancy',
         box=True,
         title='Life Expectancy Violin Plot'
     )
 
-    fig_treemap = px.treemap(
+
+@panel('treemap')
+def build_treemap(selected_countries):
+    filtered_df = filter_countries(selected_countries)
+    return px.treemap(
         filtered_df,
         path=['Country', 'Life expectancy'],
         values='Population',
         title='Population Treemap'
     )
 
-    top_10_gdp_per_capita = filtered_df.nlargest(10, 'GDP per capita')
-    top_10_population = filtered_df.nlargest(10, 'Population')
 
-    fig_top_10_gdp_per_capita = px.bar(
+@panel('top-10-gdp-per-capita')
+def build_top_10_gdp_per_capita(selected_countries):
+    top_10_gdp_per_capita = country_index.top(selected_countries, 'GDP per capita')
+    return px.bar(
         top_10_gdp_per_capita,
         x="Country",
         y="GDP per capita",
@@ -203,10 +453,17 @@ def update_graphs(selected_countries):
         labels={"GDP per capita": "GDP per Capita (USD)"}
     )
 
-    fig_top_10_population = px.scatter(
+
+@panel('top-10-population')
+def build_top_10_population(selected_countries):
+    top_10_population = country_index.top(selected_countries, 'Population')
+    # Never more than ten points, but kept on the same rendering path as the other scatters
+    return scatter(
         top_10_population,
         x="Country",
         y="Population",
+        webgl_points=webgl_points,
+        density_points=density_points,
         size="Population",
         color="Country",
         hover_name="Country",
@@ -214,17 +471,27 @@ def update_graphs(selected_countries):
         labels={"Population": "Population"}
     )
 
-    fig_3d_scatter = px.scatter_3d(
+
+@panel('3d-scatter-plot')
+def build_3d_scatter(selected_countries):
+    filtered_df = filter_countries(selected_countries)
+    return scatter_3d(
         filtered_df,
         x='Life expectancy',
         y='GDP',
         z='Population',
+        single_trace_points=webgl_points,
+        density_points=density_points,
         color='Country',
         hover_name='Country',
         title='Life Expectancy, GDP, and Population Relationship'
     )
 
-    fig_minimum_wage = px.bar(
+
+@panel('minimum-wage-chart')
+def build_minimum_wage(selected_countries):
+    filtered_df = filter_countries(selected_countries)
+    return px.bar(
         filtered_df,
         x="Country",
         y="Minimum wage",
@@ -232,11 +499,11 @@ def update_graphs(selected_countries):
         labels={"Minimum wage": "Minimum Wage (USD)"}
     )
 
-    return (
-        fig_choropleth, fig_scatter, fig_bar, fig_bubble, fig_pie, fig_gdp_per_capita, fig_line,
-        fig_urban_population_line, fig_violin, fig_treemap, fig_top_10_gdp_per_capita, fig_top_10_population,
-        fig_3d_scatter, fig_minimum_wage
-    )
+
+# Build the default (unfiltered) page in parallel at startup so the first
+# page load is served from the cache
+if prebuild:
+    update_graphs([])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,145 @@
+import warnings
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+from dash import Patch
+
+try:
+    import pycountry
+except ImportError:
+    pycountry = None
+
+# Country names in world-data-2023.csv that neither gapminder nor the ISO
+# short names spell the same way
+NAME_OVERRIDES = {
+    'Bolivia': 'BOL',
+    'Brunei': 'BRN',
+    'Cape Verde': 'CPV',
+    'Czech Republic': 'CZE',
+    'Democratic Republic of the Congo': 'COD',
+    'East Timor': 'TLS',
+    'Eswatini': 'SWZ',
+    'Federated States of Micronesia': 'FSM',
+    'Iran': 'IRN',
+    'Ivory Coast': 'CIV',
+    'Laos': 'LAO',
+    'Moldova': 'MDA',
+    'North Korea': 'PRK',
+    'Palestinian National Authority': 'PSE',
+    'Republic of Ireland': 'IRL',
+    'Republic of the Congo': 'COG',
+    'Russia': 'RUS',
+    'South Korea': 'KOR',
+    'Syria': 'SYR',
+    'Tanzania': 'TZA',
+    'The Bahamas': 'BHS',
+    'The Gambia': 'GMB',
+    'Vatican City': 'VAT',
+    'Venezuela': 'VEN',
+    'Vietnam': 'VNM',
+}
+
+
+def resolve_iso3(names, abbreviations=None, resolved=None):
+    """Resolve country names to ISO-3 codes once, reporting the names that could not be matched.
+
+    Tries ``NAME_OVERRIDES``, then plotly's gapminder table, then (if installed)
+    pycountry by ISO-2 abbreviation and by name. Names already in ``resolved``
+    (a dict of name -> code or None) are not looked up again. Returns a list of
+    codes (None where unmatched) and the sorted unmatched names.
+    """
+    resolved = dict(resolved or {})
+    lookup = None
+    if abbreviations is None:
+        abbreviations = [None] * len(names)
+    for name, abbreviation in zip(names, abbreviations):
+        if name in resolved:
+            continue
+        if lookup is None:
+            gapminder = px.data.gapminder()[['country', 'iso_alpha']].drop_duplicates()
+            lookup = dict(zip(gapminder['country'], gapminder['iso_alpha']))
+        code = NAME_OVERRIDES.get(name) or lookup.get(name)
+        if code is None and pycountry is not None:
+            country = pycountry.countries.get(alpha_2=abbreviation) if isinstance(abbreviation, str) else None
+            if country is None:
+                try:
+                    country = pycountry.countries.lookup(name)
+                except LookupError:
+                    country = None
+            code = country.alpha_3 if country is not None else None
+        resolved[name] = code
+    codes = [resolved[name] for name in names]
+    unmatched = sorted({name for name, code in zip(names, codes) if code is None})
+    return codes, unmatched
+
+
+class ChoroplethMap:
+    """Prebuilt choropleth whose updates only patch the colour arrays.
+
+    The base figure is built once for every row: countries with an ISO-3 code
+    go in the first trace (``px.choropleth`` creates it even when empty), the
+    rest in a second trace located by country name. ``rows`` holds the row
+    positions of each trace, in trace order.
+    A selection is shown by blanking the colour of the rows outside it, which
+    ``patch`` sends as a Dash ``Patch`` of just the ``z`` arrays.
+    """
+
+    def __init__(self, data, color, title, country='Country', abbreviation='Abbreviation', resolved=None):
+        self.color, self.title, self.country, self.abbreviation = color, title, country, abbreviation
+        names = data[country].tolist()
+        abbreviations = data[abbreviation].tolist() if abbreviation in data else None
+        codes, self.unmatched = resolve_iso3(names, abbreviations, resolved)
+        self.resolved = dict(zip(names, codes))
+        new_unmatched = [name for name in self.unmatched if name not in (resolved or {})]
+        if new_unmatched:
+            warnings.warn(f'No ISO-3 code for {len(new_unmatched)} countries, located by name: {new_unmatched}')
+
+        matched = np.array([code is not None for code in codes])
+        self.rows = [np.flatnonzero(matched)]
+        self.values = data[color].to_numpy(dtype=float)
+
+        matched_rows = data.iloc[self.rows[0]].assign(iso_alpha=[codes[i] for i in self.rows[0]])
+        self.base_figure = px.choropleth(
+            matched_rows,
+            locations='iso_alpha',
+            color=color,
+            hover_name=country,
+            color_continuous_scale=px.colors.sequential.Plasma,
+            title=title
+        )
+        if not matched.all():
+            self.rows.append(np.flatnonzero(~matched))
+            unmatched_rows = data.iloc[self.rows[1]]
+            self.base_figure.add_trace(go.Choropleth(
+                locations=unmatched_rows[country],
+                locationmode='country names',
+                z=unmatched_rows[color],
+                hovertext=unmatched_rows[country],
+                coloraxis='coloraxis',
+                geo='geo'
+            ))
+
+    def extended(self, data):
+        """The map of ``data`` (the old rows plus appended ones), looking up only the new country names."""
+        return ChoroplethMap(data, self.color, self.title, self.country, self.abbreviation, self.resolved)
+
+    def colors(self, positions=None):
+        """Colour array of each trace, blank (NaN) outside the selected row positions."""
+        if positions is None:
+            return [self.values[rows] for rows in self.rows]
+        selected = np.zeros(len(self.values), dtype=bool)
+        selected[positions] = True
+        return [np.where(selected[rows], self.values[rows], np.nan) for rows in self.rows]
+
+    def figure(self, positions=None):
+        figure = go.Figure(self.base_figure)
+        for trace, z in zip(figure.data, self.colors(positions)):
+            trace.z = z
+        return figure
+
+    def patch(self, positions=None):
+        patch = Patch()
+        for index, z in enumerate(self.colors(positions)):
+            patch['data'][index]['z'] = z
+        return patch
@@ -0,0 +1,27 @@
+"""WSGI entry points for running the dashboards under gunicorn (see gunicorn.conf.py).
+
+    gunicorn 'wsgi:mouse_server()'
+    gunicorn 'wsgi:world_server()'
+"""
+import importlib.util
+import os
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(filename, name):
+    """Import a script of this directory whose file name is not a valid module name."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def mouse_server():
+    import dash_app_mous
+    return dash_app_mous.server
+
+
+def world_server():
+    return load_script('world_data_2023.app.py', 'world_data_2023_app').server